@@ -8,6 +8,7 @@ from django.db import models
 from django.utils import timezone
 from users.models import User
 from boards.models import Board
+from boards.scoping import MemberScopedQuerySet
 from cards.models import Card
 
 
@@ -91,6 +92,8 @@ class Activity(models.Model):
     
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'activities'
         verbose_name = 'Activity'
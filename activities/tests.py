@@ -1,3 +1,39 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import User
+from boards.models import Board, BoardMember
+from workspaces.models import Workspace, WorkspaceMember
+from .models import Activity
 
-# Create your tests here.
+
+class ActivityScopingTests(TestCase):
+    """Activities are visible to members of their board only, each exactly once"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        colleague = User.objects.create_user('colleague@example.com', 'colleague', 'password123!')
+        workspace = Workspace.objects.create(name='Acme', slug='acme', owner=self.user)
+        board = Board.objects.create(name='Roadmap', workspace=workspace, created_by=self.user)
+        # A member of both the workspace and the board, next to other members of each
+        for user in (self.user, colleague):
+            WorkspaceMember.objects.create(workspace=workspace, user=user)
+            BoardMember.objects.create(board=board, user=user)
+        self.activities = [
+            Activity.objects.create(board=board, user=user, action_type='board_updated')
+            for user in (self.user, colleague)
+        ]
+        self.client = APIClient()
+    
+    def listed_ids(self):
+        return [row['id'] for row in self.client.get('/api/activities/').json()['results']]
+    
+    def test_non_member_sees_nothing(self):
+        self.client.force_authenticate(self.outsider)
+        
+        self.assertEqual(self.listed_ids(), [])
+    
+    def test_member_sees_each_activity_once(self):
+        self.client.force_authenticate(self.user)
+        
+        self.assertEqual(sorted(self.listed_ids()), sorted(str(activity.id) for activity in self.activities))
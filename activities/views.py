@@ -12,9 +12,7 @@ class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         """Return activities for boards where user is a member"""
-        queryset = Activity.objects.filter(
-            board__members=self.request.user
-        ).distinct()
+        queryset = Activity.objects.visible_to(self.request.user)
         
         # Filter by board
         board_id = self.request.query_params.get('board')
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class BoardsConfig(AppConfig):
     name = 'boards'
+    
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .public import forget_public_board
+        from .versioning import connect_signals
+        connect_signals()
+        post_save.connect(forget_public_board, sender='boards.Board', dispatch_uid='forget_public_board')
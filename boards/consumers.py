@@ -0,0 +1,66 @@
+"""
+Board Consumers
+boards/consumers.py
+"""
+
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from .events import board_group_name
+from .models import BoardMember
+from .presence import broadcast_presence, heartbeat, join, leave
+
+
+class BoardConsumer(AsyncWebsocketConsumer):
+    """
+    Streams change events for one board to a member's socket.
+    
+    Membership is checked once, on connect; after that the socket only
+    receives ``board.changes`` events published by ``boards.events`` and
+    ``presence.changed`` events. Clients send ``{"type": "heartbeat"}``
+    to stay present (see ``boards.presence``).
+    """
+    
+    group_name = None
+    
+    async def connect(self):
+        user = self.scope.get('user')
+        self.board_id = self.scope['url_route']['kwargs']['board_id']
+        
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+        if not await BoardMember.objects.filter(board_id=self.board_id, user=user).aexists():
+            await self.close()
+            return
+        
+        self.user_id = user.pk
+        self.group_name = board_group_name(self.board_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        try:
+            await join(self.board_id, self.user_id, self.channel_name)
+        except TimeoutError:
+            # Presence is busy; the client reconnects
+            await self.close()
+            return
+        await broadcast_presence(self.channel_layer, self.board_id, retry=True)
+    
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            await leave(self.board_id, self.channel_name)
+            await broadcast_presence(self.channel_layer, self.board_id, retry=True)
+    
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or '')
+        except ValueError:
+            return
+        if isinstance(message, dict) and message.get('type') == 'heartbeat':
+            await heartbeat(self.board_id, self.user_id, self.channel_name)
+            # Also where sockets that expired without closing are announced as gone
+            await broadcast_presence(self.channel_layer, self.board_id)
+    
+    async def board_event(self, event):
+        """Forward a pre-encoded board event"""
+        await self.send(text_data=event['text'])
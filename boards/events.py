@@ -0,0 +1,137 @@
+"""
+Board Events
+boards/events.py
+
+Live updates for open boards. Once a write commits, every WebSocket
+connected to the board (see ``boards.consumers``) is told which lists,
+cards, labels and members changed and the version the board is now at.
+Events carry ids only: nothing is read from the database after commit,
+and clients fetch the rows they care about from the delta sync endpoint
+(``changes/?since=``).
+
+All changes a transaction makes to one board go out as a single event,
+sent once the transaction commits; changes made inside a savepoint that
+is rolled back are never sent.
+"""
+
+import json
+import weakref
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+# Object type -> key in the event payload
+EVENT_KEYS = {
+    'board': 'board',
+    'list': 'lists',
+    'card': 'cards',
+    'label': 'labels',
+    'member': 'members',
+}
+
+
+def board_group_name(board_id):
+    """Channel layer group of the sockets connected to a board"""
+    return f"board_{board_id}"
+
+
+class PendingBoardEvents:
+    """
+    Changes made by the current transaction, per board, sent once it commits.
+    
+    Changes are collected in runs, one per stretch of writes at the same
+    savepoint depth, and each run is handed to ``transaction.on_commit``
+    where it was made, so Django drops the runs of a savepoint that is
+    rolled back. On commit the surviving runs merge into ``committed``,
+    which goes out as one event per board when Django lets go of the last
+    run: only those callbacks refer to this object, so it is freed as the
+    commit hooks finish, or with nothing to send if the transaction rolls
+    back.
+    """
+    
+    def __init__(self):
+        # (savepoint ids, {board_id: [version, {(object_type, object_id): is_deleted}]})
+        self.runs = []
+        self.committed = {}
+        self.closed = False
+        weakref.finalize(self, _send_all, self.committed)
+    
+    def add(self, savepoints, board_id, version, changes):
+        if not self.runs or self.runs[-1][0] != savepoints:
+            self.runs.append((savepoints, {}))
+            index = len(self.runs) - 1
+            transaction.on_commit(lambda: self.commit_run(index), robust=True)
+        _merge(
+            self.runs[-1][1],
+            board_id,
+            version,
+            {(object_type, object_id): is_deleted for object_type, object_id, is_deleted in changes}
+        )
+    
+    def commit_run(self, index):
+        # The transaction is over; later writes start a new one
+        self.closed = True
+        for board_id, (version, latest) in self.runs[index][1].items():
+            _merge(self.committed, board_id, version, latest)
+
+
+def _send_all(committed):
+    for board_id, (version, latest) in committed.items():
+        send_board_changes(board_id, version, latest)
+
+
+def _merge(boards, board_id, version, latest):
+    pending = boards.setdefault(board_id, [version, {}])
+    pending[0] = max(pending[0], version)
+    pending[1].update(latest)
+
+
+def _pending_events():
+    """The pending events of the current transaction and its savepoint ids, or None outside of one"""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    pending = connection.pending_board_events() if hasattr(connection, 'pending_board_events') else None
+    if pending is None or pending.closed:
+        pending = PendingBoardEvents()
+        connection.pending_board_events = weakref.ref(pending)
+    return pending, tuple(sid for sid in connection.savepoint_ids if sid is not None)
+
+
+def publish_board_changes(board_id, version, changes):
+    """Push ``changes`` — ``(object_type, object_id, is_deleted)`` — after the current transaction commits"""
+    pending = _pending_events()
+    if pending is None:
+        send_board_changes(
+            board_id,
+            version,
+            {(object_type, object_id): is_deleted for object_type, object_id, is_deleted in changes}
+        )
+    else:
+        events, savepoints = pending
+        events.add(savepoints, board_id, version, changes)
+
+
+def send_board_changes(board_id, version, latest):
+    """Send one ``board.changes`` event; ``latest`` maps ``(object_type, object_id)`` to is_deleted"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    
+    changed = {key: [] for key in EVENT_KEYS.values()}
+    deleted = {key: [] for key in EVENT_KEYS.values()}
+    for (object_type, object_id), is_deleted in latest.items():
+        (deleted if is_deleted else changed)[EVENT_KEYS[object_type]].append(object_id)
+    
+    event = {
+        'type': 'board.changes',
+        'board_id': board_id,
+        'version': version,
+        'changed': changed,
+        'deleted': deleted,
+    }
+    async_to_sync(channel_layer.group_send)(
+        board_group_name(board_id),
+        {'type': 'board.event', 'text': json.dumps(event, cls=JSONEncoder)}
+    )
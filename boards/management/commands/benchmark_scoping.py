@@ -0,0 +1,148 @@
+"""
+Benchmark Membership Scoping
+boards/management/commands/benchmark_scoping.py
+"""
+
+import statistics
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import User
+from workspaces.models import Workspace, WorkspaceMember
+from boards.models import Board, BoardMember
+from lists.models import List
+from cards.models import Card, Checklist, ChecklistItem, Comment
+from activities.models import Activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway dataset and compare join + DISTINCT membership filters '
+        'with the EXISTS-based visible_to() scoping. All seeded rows are rolled back.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--boards', type=int, default=20, help='Boards the benchmark user belongs to')
+        parser.add_argument('--members', type=int, default=10, help='Other members per board')
+        parser.add_argument('--lists', type=int, default=5, help='Lists per board')
+        parser.add_argument('--cards', type=int, default=50, help='Cards per list')
+        parser.add_argument('--repeat', type=int, default=7, help='Runs per query; the median is reported')
+        parser.add_argument('--explain', action='store_true', help='Print the query plans as well')
+    
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(options)
+            self.stdout.write(f"{'query':<16}{'rows':>8}{'join+distinct ms':>20}{'exists ms':>12}")
+            for name, legacy, scoped in self.queries(user):
+                legacy_ms, rows = self.time(legacy, options['repeat'])
+                scoped_ms, scoped_rows = self.time(scoped, options['repeat'])
+                if rows != scoped_rows:
+                    self.stderr.write(f"{name}: row counts differ ({rows} vs {scoped_rows})")
+                self.stdout.write(f"{name:<16}{rows:>8}{legacy_ms:>20.2f}{scoped_ms:>12.2f}")
+                if options['explain']:
+                    self.stdout.write(legacy.explain())
+                    self.stdout.write(scoped.explain())
+            transaction.set_rollback(True)
+    
+    def queries(self, user):
+        """(name, legacy queryset, scoped queryset) shaped like the viewset queries"""
+        return [
+            (
+                'workspaces',
+                Workspace.objects.filter(members=user).distinct(),
+                Workspace.objects.visible_to(user),
+            ),
+            (
+                'boards',
+                Board.objects.filter(members=user).distinct(),
+                Board.objects.visible_to(user),
+            ),
+            (
+                'lists',
+                List.objects.filter(board__members=user).distinct().order_by('position'),
+                List.objects.visible_to(user).order_by('position'),
+            ),
+            (
+                'cards',
+                Card.objects.filter(list__board__members=user).distinct().order_by('position'),
+                Card.objects.visible_to(user).order_by('position'),
+            ),
+            (
+                'checklist items',
+                ChecklistItem.objects.filter(checklist__card__list__board__members=user).distinct(),
+                ChecklistItem.objects.visible_to(user),
+            ),
+            (
+                'comments',
+                Comment.objects.filter(card__list__board__members=user).distinct().order_by('-created_at', '-id')[:20],
+                Comment.objects.visible_to(user).order_by('-created_at', '-id')[:20],
+            ),
+            (
+                'activities',
+                Activity.objects.filter(board__members=user).distinct().order_by('-created_at')[:50],
+                Activity.objects.visible_to(user).order_by('-created_at')[:50],
+            ),
+        ]
+    
+    def time(self, queryset, repeat):
+        timings = []
+        rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(list(queryset.all()))
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), rows
+    
+    def seed(self, options):
+        """Bulk-insert the benchmark dataset and return the user it is measured for"""
+        tag = uuid.uuid4().hex[:8]
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(email=f"bench-{tag}-{i}@example.com", username=f"bench-{tag}-{i}")
+            for i in range(options['members'] + 1)
+        ])
+        user = users[0]
+        
+        workspace = Workspace.objects.create(name=f"Benchmark {tag}", owner=user)
+        WorkspaceMember.objects.bulk_create([
+            WorkspaceMember(workspace=workspace, user=member) for member in users
+        ])
+        
+        boards = Board.objects.bulk_create([
+            Board(workspace=workspace, name=f"Board {i}", slug=f"bench-{tag}-{i}", created_by=user)
+            for i in range(options['boards'])
+        ])
+        BoardMember.objects.bulk_create([
+            BoardMember(board=board, user=member) for board in boards for member in users
+        ])
+        
+        lists = List.objects.bulk_create([
+            List(board=board, name=f"List {i}", position=i + 1)
+            for board in boards for i in range(options['lists'])
+        ])
+        cards = Card.objects.bulk_create([
+            Card(list=lst, board_id=lst.board_id, title=f"Card {i}", position=(i + 1) * Card.POSITION_GAP, created_by=user)
+            for lst in lists for i in range(options['cards'])
+        ])
+        checklists = Checklist.objects.bulk_create([
+            Checklist(card=card, board_id=card.board_id, title='Checklist', position=1) for card in cards
+        ])
+        ChecklistItem.objects.bulk_create([
+            ChecklistItem(checklist=checklist, board_id=checklist.board_id, title=f"Item {i}", position=i + 1)
+            for checklist in checklists for i in range(3)
+        ])
+        Comment.objects.bulk_create([
+            Comment(card=card, board_id=card.board_id, user=user, content='Benchmark comment', created_at=now)
+            for card in cards for _ in range(2)
+        ])
+        Activity.objects.bulk_create([
+            Activity(board_id=card.board_id, card=card, user=user, action_type='card_created', created_at=now)
+            for card in cards
+        ])
+        self.stdout.write(
+            f"Seeded {len(boards)} boards, {len(lists)} lists, {len(cards)} cards "
+            f"with {len(users)} members per board"
+        )
+        return user
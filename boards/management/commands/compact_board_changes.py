@@ -0,0 +1,54 @@
+"""
+Compact Board Changes
+boards/management/commands/compact_board_changes.py
+"""
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from boards.models import Board, BoardChange
+
+
+class Command(BaseCommand):
+    help = (
+        'Drop board change log entries older than --days. Clients holding a '
+        'version from before the compaction are told to resync in full.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Keep changes made within this many days'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        floors = BoardChange.objects.filter(
+            changed_at__lt=cutoff
+        ).values('board_id').annotate(floor=Max('version')).order_by()
+
+        removed = 0
+        for row in floors.iterator():
+            with transaction.atomic():
+                Board.objects.filter(
+                    pk=row['board_id'],
+                    compacted_version__lt=row['floor']
+                ).update(compacted_version=row['floor'])
+                deleted, _ = BoardChange.objects.filter(
+                    board_id=row['board_id'],
+                    version__lte=row['floor']
+                ).delete()
+                removed += deleted
+
+        # Changes logged while their board was being deleted
+        orphans, _ = BoardChange.objects.exclude(
+            board_id__in=Board.objects.values('id')
+        ).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed} compacted and {orphans} orphaned board changes"
+        ))
@@ -0,0 +1,56 @@
+"""
+Renormalize Positions
+boards/management/commands/renormalize_positions.py
+"""
+
+from django.core.management.base import BaseCommand
+from boards.renormalize import renormalize_positions
+
+
+class Command(BaseCommand):
+    help = (
+        'Renumber list and card positions that are duplicated or sparse, one '
+        'board or list per short transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Boards or lists checked per query, between pauses'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to sleep after each batch'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Handle at most this many boards and lists'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be renumbered'
+        )
+
+    def handle(self, *args, **options):
+        result = renormalize_positions(
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            limit=options['limit'],
+            dry_run=options['dry_run']
+        )
+        if options['dry_run']:
+            self.stdout.write(
+                f"{result['boards']} boards and {result['lists']} lists need renumbering"
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Renumbered {result['lists_renumbered']} lists on {result['boards']} boards "
+            f"and respaced {result['cards_respaced']} cards in {result['lists']} lists"
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+def seed_list_position_seq(apps, schema_editor):
+    """Start each board counter at its current highest list position"""
+    Board = apps.get_model('boards', 'Board')
+    List = apps.get_model('lists', 'List')
+    Board.objects.update(
+        list_position_seq=Coalesce(
+            Subquery(
+                List.objects.filter(board=OuterRef('pk'))
+                .order_by()
+                .values('board')
+                .annotate(max_position=Max('position'))
+                .values('max_position')
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0001_initial'),
+        ('boards', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='list_position_seq',
+            field=models.IntegerField(default=0, editable=False, help_text='Last position handed out to a list on this board'),
+        ),
+        migrations.RunPython(seed_list_position_seq, migrations.RunPython.noop),
+    ]
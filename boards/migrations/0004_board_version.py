@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_list_position_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Bumped on every change to the board or anything on it'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-17 04:49
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0004_board_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='compacted_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Changes up to this version have been dropped from the change log'),
+        ),
+        migrations.CreateModel(
+            name='BoardChange',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('object_type', models.CharField(choices=[('board', 'Board'), ('list', 'List'), ('card', 'Card'), ('label', 'Label'), ('member', 'Member')], max_length=20)),
+                ('object_id', models.UUIDField(help_text='User id for memberships')),
+                ('version', models.PositiveBigIntegerField()),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='boards.board')),
+            ],
+            options={
+                'verbose_name': 'Board Change',
+                'verbose_name_plural': 'Board Changes',
+                'db_table': 'board_changes',
+                'ordering': ['version'],
+                'indexes': [models.Index(fields=['board', 'version'], name='board_chang_board_i_d0f48e_idx'), models.Index(fields=['changed_at'], name='board_chang_changed_f49e1c_idx')],
+                'unique_together': {('board', 'object_type', 'object_id')},
+            },
+        ),
+    ]
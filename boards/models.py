@@ -9,6 +9,8 @@ from django.utils import timezone
 from django.utils.text import slugify
 from users.models import User
 from workspaces.models import Workspace
+from .positions import exclude_counters
+from .scoping import MemberScopedQuerySet
 
 
 class Board(models.Model):
@@ -26,6 +28,8 @@ class Board(models.Model):
         ('image', 'Image'),
     ]
     
+    MEMBERSHIP_PATH = 'pk'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     workspace = models.ForeignKey(
         Workspace,
@@ -55,6 +59,22 @@ class Board(models.Model):
     is_starred = models.BooleanField(default=False)
     is_archived = models.BooleanField(default=False)
     
+    list_position_seq = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Last position handed out to a list on this board"
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped on every change to the board or anything on it"
+    )
+    compacted_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Changes up to this version have been dropped from the change log"
+    )
+    
     created_by = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -70,6 +90,8 @@ class Board(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     archived_at = models.DateTimeField(blank=True, null=True)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'boards'
         verbose_name = 'Board'
@@ -88,8 +110,15 @@ class Board(models.Model):
         """Auto-generate slug from name if not provided"""
         if not self.slug:
             self.slug = slugify(self.name)
+        exclude_counters(self, kwargs, 'list_position_seq', 'version', 'compacted_version')
         super().save(*args, **kwargs)
     
+    def delete(self, *args, **kwargs):
+        """Delete the board; its change log goes with it, so the cascade logs nothing"""
+        from .versioning import muted_board_changes
+        with muted_board_changes():
+            return super().delete(*args, **kwargs)
+    
     def archive(self):
         """Archive the board"""
         self.is_archived = True
@@ -183,6 +212,8 @@ class Label(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'labels'
         verbose_name = 'Label'
@@ -193,4 +224,45 @@ class Label(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.name} ({self.board.name})"
\ No newline at end of file
+        return f"{self.name} ({self.board.name})"
+
+
+class BoardChange(models.Model):
+    """Latest change to each list, card, label or membership on a board, for delta sync"""
+    
+    OBJECT_TYPE_CHOICES = [
+        ('board', 'Board'),
+        ('list', 'List'),
+        ('card', 'Card'),
+        ('label', 'Label'),
+        ('member', 'Member'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # No database constraint: changes logged while a board is being deleted
+    # must not block the delete; compact_board_changes removes the orphans
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='changes'
+    )
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.UUIDField(help_text="User id for memberships")
+    version = models.PositiveBigIntegerField()
+    is_deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'board_changes'
+        verbose_name = 'Board Change'
+        verbose_name_plural = 'Board Changes'
+        unique_together = [['board', 'object_type', 'object_id']]
+        ordering = ['version']
+        indexes = [
+            models.Index(fields=['board', 'version']),
+            models.Index(fields=['changed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.object_type} {self.object_id} @ {self.board_id} v{self.version}"
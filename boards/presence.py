@@ -0,0 +1,181 @@
+"""
+Board Presence
+boards/presence.py
+
+Who is looking at a board right now, kept in the cache and never in the
+database. Every open board socket (see ``boards.consumers``) holds a key of
+its own, named after its channel, that expires ``PRESENCE_TTL`` seconds
+after its last heartbeat, so a heartbeat is a constant-time ``touch`` and a
+crashed client simply drops out. A per-board registry maps the open
+channels to their users; it is only rewritten when a socket connects or
+disconnects, under a short cache lock.
+
+A user is present while any of their sockets is. Changes are pushed to the
+board's sockets as ``presence.changed`` events listing the users that
+``joined`` and ``left`` since the previous event, which makes a second tab
+invisible to everyone else and announces a user as gone only once their
+last socket closes or expires. Events go out at most once per
+``PRESENCE_BATCH`` seconds per board; whatever changes in between is
+folded into the next one. Expired sockets are noticed on the next
+heartbeat from anyone on the board. The full list is read with
+``present_user_ids``.
+
+Presence is per process with the local-memory cache; set REDIS_URL to
+share it between workers.
+"""
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from django.core.cache import cache
+from .events import board_group_name
+
+# Clients heartbeat well inside this window
+PRESENCE_TTL = 60
+# Minimum seconds between two presence events on a board
+PRESENCE_BATCH = 1
+# Open channels are forgotten if no socket on the board connects, leaves or flushes for this long
+REGISTRY_TTL = 24 * 60 * 60
+
+
+def _connection_key(board_id, channel_name):
+    return f"board-presence:{board_id}:{channel_name}"
+
+
+def _registry_key(board_id):
+    return f"board-presence:{board_id}"
+
+
+def _announced_key(board_id):
+    return f"board-presence-announced:{board_id}"
+
+
+@asynccontextmanager
+async def _registry_lock(board_id):
+    """
+    Serialize registry rewrites on a board.
+    
+    Raises TimeoutError if the lock is not free within about a second. The
+    lock holds a token of its own, so a holder whose lock expired does not
+    release the next one's.
+    """
+    key = f"board-presence-lock:{board_id}"
+    token = uuid.uuid4().hex
+    for _ in range(100):
+        if await cache.aadd(key, token, 5):
+            break
+        await asyncio.sleep(0.01)
+    else:
+        raise TimeoutError(f"Presence registry of board {board_id} is locked")
+    try:
+        yield
+    finally:
+        if await cache.aget(key) == token:
+            await cache.adelete(key)
+
+
+async def join(board_id, user_id, channel_name):
+    """Register a newly opened socket of ``user_id``; raises TimeoutError if the registry stays locked"""
+    async with _registry_lock(board_id):
+        await cache.aset(_connection_key(board_id, channel_name), user_id, PRESENCE_TTL)
+        registry = await cache.aget(_registry_key(board_id)) or {}
+        registry[channel_name] = user_id
+        await cache.aset(_registry_key(board_id), registry, REGISTRY_TTL)
+
+
+async def heartbeat(board_id, user_id, channel_name):
+    """Keep a socket present"""
+    if not await cache.atouch(_connection_key(board_id, channel_name), PRESENCE_TTL):
+        # Expired in the meantime (a long pause); come back as a new socket
+        try:
+            await join(board_id, user_id, channel_name)
+        except TimeoutError:
+            # Still unregistered, so the next heartbeat tries again
+            pass
+
+
+async def leave(board_id, channel_name):
+    """Forget a closed socket"""
+    await cache.adelete(_connection_key(board_id, channel_name))
+    try:
+        async with _registry_lock(board_id):
+            registry = await cache.aget(_registry_key(board_id)) or {}
+            if registry.pop(channel_name, None) is not None:
+                await cache.aset(_registry_key(board_id), registry, REGISTRY_TTL)
+    except TimeoutError:
+        # Its key is gone, so the next flush drops the socket from the registry
+        pass
+
+
+async def _live_users(board_id, registry):
+    """Drop expired sockets from ``registry``; return the users of the live ones"""
+    keys = {_connection_key(board_id, channel_name): channel_name for channel_name in registry}
+    live = await cache.aget_many(list(keys))
+    for key, channel_name in keys.items():
+        if key not in live:
+            del registry[channel_name]
+    return set(registry.values())
+
+
+async def flush_presence(board_id):
+    """
+    Work out who joined and left the board since the last presence event.
+
+    Returns ``(joined, left)``, or None if an event went out less than
+    ``PRESENCE_BATCH`` seconds ago or the registry stayed locked.
+    """
+    if not await cache.aadd(f"board-presence-flush:{board_id}", True, PRESENCE_BATCH):
+        return None
+    try:
+        async with _registry_lock(board_id):
+            registry = await cache.aget(_registry_key(board_id)) or {}
+            present = await _live_users(board_id, registry)
+            await cache.aset(_registry_key(board_id), registry, REGISTRY_TTL)
+            announced = await cache.aget(_announced_key(board_id)) or set()
+            await cache.aset(_announced_key(board_id), present, REGISTRY_TTL)
+    except TimeoutError:
+        # Treated like the batch window: the changes go out with a later flush
+        return None
+    return present - announced, announced - present
+
+
+async def broadcast_presence(channel_layer, board_id, retry=False):
+    """
+    Send the board's pending presence changes to its sockets.
+
+    Inside the batch window nothing is sent; with ``retry`` another attempt
+    is scheduled for when the window has passed, so a change is never held
+    back longer than ``PRESENCE_BATCH``.
+    """
+    changes = await flush_presence(board_id)
+    if changes is None:
+        if retry:
+            asyncio.get_running_loop().call_later(
+                PRESENCE_BATCH + 0.1,
+                lambda: asyncio.ensure_future(broadcast_presence(channel_layer, board_id))
+            )
+        return
+    joined, left = changes
+    if joined or left:
+        await channel_layer.group_send(board_group_name(board_id), presence_event(joined, left))
+
+
+def present_user_ids(board_id, user_ids):
+    """The subset of ``user_ids`` with a socket open on the board"""
+    registry = cache.get(_registry_key(board_id)) or {}
+    keys = {_connection_key(board_id, channel_name): user_id for channel_name, user_id in registry.items()}
+    present = {keys[key] for key in cache.get_many(list(keys))}
+    return [user_id for user_id in user_ids if user_id in present]
+
+
+def presence_event(joined=(), left=()):
+    """Channel layer message announcing presence changes (see ``BoardConsumer.board_event``)"""
+    return {
+        'type': 'board.event',
+        'text': json.dumps({
+            'type': 'presence.changed',
+            'joined': sorted(str(user_id) for user_id in joined),
+            'left': sorted(str(user_id) for user_id in left),
+        }),
+    }
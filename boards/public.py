@@ -0,0 +1,87 @@
+"""
+Public Boards
+boards/public.py
+
+Read-only payloads for boards with ``visibility='public'``, served to
+anonymous visitors. The payload is the board snapshot without members or
+member ids, cached per board version like the snapshot itself.
+
+Visitors must not cost a query each, so the current version of a public
+board is also cached, for ``PUBLIC_BOARD_MAX_AGE`` seconds: a warm request
+is two cache gets and no database access, and the payload lags writes by
+at most that long. The same value is sent as ``Cache-Control: max-age``
+with a version ``ETag``, so shared caches in front of the app absorb most
+traffic before it arrives.
+"""
+
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from .models import Board
+from .snapshot import SNAPSHOT_CACHE_TIMEOUT, get_board_snapshot
+
+PUBLIC_BOARD_MAX_AGE = 60
+
+
+def _version_key(board_id):
+    return f"board-public-version:{board_id}"
+
+
+def public_board_etag(board_id, version):
+    return f'"{board_id}-{version}"'
+
+
+def etag_matches(etag, if_none_match):
+    """Weak comparison of ``etag`` against an If-None-Match header, as for GET in RFC 9110"""
+    tags = parse_etags(if_none_match)
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def build_public_board(board):
+    """The snapshot of ``board`` without who is on it"""
+    snapshot = get_board_snapshot(board)
+    payload = {key: value for key, value in snapshot.items() if key != 'members'}
+    payload['lists'] = [
+        dict(lst, cards=[
+            {key: value for key, value in card.items() if key != 'member_ids'}
+            for card in lst['cards']
+        ])
+        for lst in snapshot['lists']
+    ]
+    return payload
+
+
+def get_public_board_version(board_id):
+    """Current version of a public board, or None if there is no such public board"""
+    version = cache.get(_version_key(board_id))
+    if version is None:
+        version = Board.objects.filter(
+            pk=board_id,
+            visibility='public',
+            is_archived=False
+        ).values_list('version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(_version_key(board_id), version, PUBLIC_BOARD_MAX_AGE)
+    return version
+
+
+def get_public_board(board_id, version):
+    """
+    The public payload of a board at ``version`` (from ``get_public_board_version``).
+    
+    On a miss the payload is built from the board as it is now, which may
+    be a newer version; its ``version`` field says which.
+    """
+    payload = cache.get(f"board-public:{board_id}:{version}")
+    if payload is None:
+        board = Board.objects.filter(pk=board_id, visibility='public', is_archived=False).first()
+        if board is None:
+            return None
+        payload = build_public_board(board)
+        cache.set(f"board-public:{board_id}:{board.version}", payload, SNAPSHOT_CACHE_TIMEOUT)
+    return payload
+
+
+def forget_public_board(sender, instance, **kwargs):
+    """Drop the cached version when a board is saved, so going private takes effect at once"""
+    cache.delete(_version_key(instance.pk))
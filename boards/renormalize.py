@@ -0,0 +1,117 @@
+"""
+Position Renormalization
+boards/renormalize.py
+
+Positions drift: deleted and archived rows leave holes, direct position
+writes can collide, and parent counters only ever grow. This job finds the
+boards whose lists and the lists whose cards are duplicated or sparse and
+renumbers each parent in place with one ``ROW_NUMBER()`` update (see
+``lists.ordering.renumber_lists`` and ``cards.ordering.renumber_list``).
+
+Detection never scans a whole table: parents are walked in primary-key
+order, ``batch_size`` at a time, and each batch runs one ``GROUP BY``
+restricted to its parents, which the ``(parent, position)`` indexes answer.
+Each parent is then renumbered in its own short transaction, holding only
+that parent's row lock, and the job pauses between batches so it can run
+against a live database. Run it with ``manage.py renormalize_positions`` or
+enqueue ``boards.tasks.renormalize_positions_task`` on a schedule.
+"""
+
+import time
+from django.db.models import Count, F, Max, Min, Q
+from lists.models import List
+from lists.ordering import renumber_lists
+from cards.models import Card
+from cards.ordering import renumber_list
+from .models import Board
+
+# Renumber once the last position is this many times what n rows need
+SPARSE_RATIO = 2
+
+
+def boards_to_renumber(board_ids):
+    """Those of ``board_ids`` whose list positions are duplicated or sparse"""
+    return List.objects.filter(board_id__in=board_ids).values('board_id').annotate(
+        rows=Count('id'),
+        distinct_positions=Count('position', distinct=True),
+        first=Min('position'),
+        last=Max('position')
+    ).filter(
+        Q(distinct_positions__lt=F('rows')) |
+        Q(first__lt=1) |
+        Q(last__gt=F('rows') * SPARSE_RATIO)
+    ).order_by('board_id').values_list('board_id', flat=True)
+
+
+def lists_to_respace(list_ids):
+    """Those of ``list_ids`` whose card positions are duplicated or sparse"""
+    return Card.objects.filter(list_id__in=list_ids).values('list_id').annotate(
+        rows=Count('id'),
+        distinct_positions=Count('position', distinct=True),
+        first=Min('position'),
+        last=Max('position')
+    ).filter(
+        Q(distinct_positions__lt=F('rows')) |
+        Q(first__lte=0) |
+        Q(last__gt=F('rows') * Card.POSITION_GAP * SPARSE_RATIO)
+    ).order_by('list_id').values_list('list_id', flat=True)
+
+
+def _keyset_batches(queryset, batch_size, *fields):
+    """Yield ``queryset`` rows of ``pk`` plus ``fields`` in pk order, ``batch_size`` rows per query"""
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(page.order_by('pk').values_list('pk', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def _scan(queryset, detect, batch_size, pause, limit, *fields):
+    """
+    Yield the rows of ``queryset`` that ``detect`` picks out of each keyset batch.
+    
+    Stops after ``limit`` rows and sleeps ``pause`` seconds between batches.
+    """
+    found = 0
+    for rows in _keyset_batches(queryset, batch_size, *fields):
+        drifted = set(detect([row[0] for row in rows]))
+        for row in rows:
+            if row[0] not in drifted:
+                continue
+            yield row
+            found += 1
+            if limit and found >= limit:
+                return
+        if pause:
+            time.sleep(pause)
+
+
+def renormalize_positions(batch_size=100, pause=0.1, limit=None, dry_run=False):
+    """
+    Renumber drifted list and card positions; return what was (or would be) touched.
+    
+    ``limit`` caps the number of boards and of lists handled in one run.
+    """
+    result = {'boards': 0, 'lists': 0, 'lists_renumbered': 0, 'cards_respaced': 0}
+    
+    # Parents deleted since they were found are skipped
+    for (board_id,) in _scan(Board.objects.all(), boards_to_renumber, batch_size, pause, limit):
+        result['boards'] += 1
+        if dry_run:
+            continue
+        try:
+            result['lists_renumbered'] += len(renumber_lists(board_id))
+        except Board.DoesNotExist:
+            pass
+    for list_id, board_id in _scan(List.objects.all(), lists_to_respace, batch_size, pause, limit, 'board_id'):
+        result['lists'] += 1
+        if dry_run:
+            continue
+        try:
+            result['cards_respaced'] += renumber_list(list_id, board_id)
+        except List.DoesNotExist:
+            pass
+    return result
@@ -0,0 +1,11 @@
+"""
+Board WebSocket Routing
+boards/routing.py
+"""
+
+from django.urls import path
+from .consumers import BoardConsumer
+
+websocket_urlpatterns = [
+    path('ws/boards/<uuid:board_id>/', BoardConsumer.as_asgi()),
+]
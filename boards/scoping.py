@@ -0,0 +1,37 @@
+"""
+Membership Scoping
+boards/scoping.py
+
+"Can this user see this row?" is answered with a correlated ``EXISTS`` on
+the membership table instead of a join through ``members``. The join yields
+one row per matching membership and needs ``DISTINCT`` to undo that, which
+forces a sort or hash over the whole result and stops ``ORDER BY`` from
+using an index. ``EXISTS`` is a semi-join: each outer row is kept or dropped
+once, so no deduplication is needed and the outer query keeps its plan.
+
+Scoped models declare how to reach their membership table:
+
+- ``MEMBERSHIP_MODEL``: the membership model label (default ``'boards.BoardMember'``)
+- ``MEMBERSHIP_FIELD``: its foreign key to the scope (default ``'board'``)
+- ``MEMBERSHIP_PATH``: the path from the scoped model to the scope's id
+  (default ``'board'``; ``'pk'`` on the scope model itself)
+"""
+
+from django.apps import apps
+from django.db import models
+from django.db.models import Exists, OuterRef
+
+
+class MemberScopedQuerySet(models.QuerySet):
+    """QuerySet that can be narrowed to the rows a user is a member of"""
+    
+    def membership_exists(self, user):
+        """Correlated EXISTS over the user's membership rows for the outer row's scope"""
+        membership = apps.get_model(getattr(self.model, 'MEMBERSHIP_MODEL', 'boards.BoardMember'))
+        field = getattr(self.model, 'MEMBERSHIP_FIELD', 'board')
+        path = getattr(self.model, 'MEMBERSHIP_PATH', 'board')
+        return Exists(membership.objects.filter(user=user, **{field: OuterRef(path)}))
+    
+    def visible_to(self, user):
+        """Rows in a board (or workspace) ``user`` is a member of; no DISTINCT needed"""
+        return self.filter(self.membership_exists(user))
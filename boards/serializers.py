@@ -48,13 +48,22 @@ class BoardSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'slug', 'created_by', 'created_at', 'updated_at', 'archived_at']
     
+    # The list and detail views annotate these (see BoardViewSet.annotate_counts);
+    # other responses, such as create and update, fall back to a query.
+    
     def get_lists_count(self, obj):
+        if hasattr(obj, 'lists_count'):
+            return obj.lists_count
         return obj.lists.filter(is_archived=False).count()
     
     def get_members_count(self, obj):
+        if hasattr(obj, 'members_count'):
+            return obj.members_count
         return obj.board_members.count()
     
     def get_is_starred_by_user(self, obj):
+        if hasattr(obj, 'is_starred_by_user'):
+            return obj.is_starred_by_user
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return BoardStar.objects.filter(
@@ -89,6 +98,13 @@ class BoardDetailSerializer(BoardSerializer):
         fields = BoardSerializer.Meta.fields + ['board_members', 'labels']
 
 
+class CopyBoardSerializer(serializers.Serializer):
+    """Serializer for copying boards and instantiating templates"""
+    
+    name = serializers.CharField(max_length=255, required=False)
+    workspace = serializers.UUIDField(required=False)
+
+
 class AddBoardMemberSerializer(serializers.Serializer):
     """Serializer for adding members to board"""
     
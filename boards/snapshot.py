@@ -0,0 +1,249 @@
+"""
+Board Snapshot
+boards/snapshot.py
+
+Everything the kanban view needs to render one board in a single payload:
+the board, its members and labels, its open lists and their open cards with
+label ids, member ids and badge counts. The payload is assembled from a
+fixed number of ``values()`` queries, however many lists and cards the
+board has, and is plain data so it is serialized exactly once.
+
+With ``cards_per_list`` only the first cards of every list are included,
+picked by one ``ROW_NUMBER()`` window partitioned by list. Each list that
+has more carries a ``next_cursor`` for ``build_list_cards_page``, so the
+first paint stays bounded however long a column grows.
+
+Snapshots are cached under ``(board id, board version)``. The version is
+bumped by every write to the board (see ``boards.versioning``), so a warm
+open costs the board lookup plus one cache get. Clients holding a version
+poll ``build_board_changes`` for just the objects changed since.
+"""
+
+import base64
+from collections import defaultdict
+from uuid import UUID
+from django.core.cache import cache
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from lists.models import List
+from cards.models import Card, CardLabel, CardMember
+from .models import BoardChange, BoardMember, Label
+
+# Superseded versions are never read again and simply age out
+SNAPSHOT_CACHE_TIMEOUT = 60 * 60
+
+# Upper bound for windowed snapshots and list card pages
+MAX_CARDS_PER_LIST = 200
+
+BOARD_FIELDS = [
+    'id', 'version', 'name', 'slug', 'description',
+    'background_type', 'background_value', 'visibility',
+    'is_template', 'is_archived', 'created_at', 'updated_at'
+]
+MEMBER_FIELDS = [
+    'user_id', 'role', 'user__username', 'user__first_name',
+    'user__last_name', 'user__avatar_url'
+]
+LIST_FIELDS = ['id', 'name', 'position', 'is_archived']
+CARD_FIELDS = [
+    'id', 'list_id', 'title', 'position', 'cover_type', 'cover_value',
+    'due_date', 'is_completed', 'is_archived', 'members_count', 'checklists_count',
+    'attachments_count', 'comments_count', 'checklist_items_count',
+    'checklist_items_completed_count'
+]
+
+
+def _pairs_by_card(queryset, field):
+    """Group ``(card_id, field)`` rows into ``{card_id: [field, ...]}``"""
+    grouped = defaultdict(list)
+    for card_id, value in queryset.values_list('card_id', field):
+        grouped[card_id].append(value)
+    return grouped
+
+
+def _board_row(board):
+    row = {field: getattr(board, field) for field in BOARD_FIELDS}
+    row['workspace'] = board.workspace_id
+    return row
+
+
+def _member_rows(memberships):
+    return [
+        {
+            'id': row['user_id'],
+            'role': row['role'],
+            'username': row['user__username'],
+            'first_name': row['user__first_name'],
+            'last_name': row['user__last_name'],
+            'avatar_url': row['user__avatar_url'],
+        }
+        for row in memberships.values(*MEMBER_FIELDS)
+    ]
+
+
+def _label_rows(labels):
+    return list(labels.values('id', 'name', 'color'))
+
+
+def _list_rows(lists):
+    return list(lists.order_by('position').values(*LIST_FIELDS))
+
+
+def _card_rows(cards):
+    """Cards with badge counts, label ids and member ids, in three queries"""
+    label_ids = _pairs_by_card(CardLabel.objects.filter(card__in=cards), 'label_id')
+    member_ids = _pairs_by_card(CardMember.objects.filter(card__in=cards), 'user_id')
+    rows = list(cards.with_badge_counts().order_by('position', 'id').values(*CARD_FIELDS))
+    for row in rows:
+        row['label_ids'] = label_ids.get(row['id'], [])
+        row['member_ids'] = member_ids.get(row['id'], [])
+    return rows
+
+
+def encode_card_cursor(card):
+    """Opaque cursor pointing just after ``card`` (a card row) in its list"""
+    raw = f"{card['position']!r}|{card['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_card_cursor(cursor):
+    """Return ``(position, card id)`` from a cursor; raise ValueError if it is malformed"""
+    try:
+        position, card_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return float(position), UUID(card_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def _first_cards(cards, per_list):
+    """The first ``per_list`` cards of every list, by position"""
+    ranked = cards.annotate(
+        list_rank=Window(
+            RowNumber(),
+            partition_by=[F('list_id')],
+            order_by=[F('position').asc(), F('id').asc()]
+        )
+    ).filter(list_rank__lte=per_list)
+    return Card.objects.filter(pk__in=ranked.values('pk'))
+
+
+def build_board_snapshot(board, cards_per_list=None):
+    """Return the kanban snapshot of ``board`` as plain dicts and lists"""
+    snapshot = _board_row(board)
+    snapshot['members'] = _member_rows(BoardMember.objects.filter(board=board))
+    snapshot['labels'] = _label_rows(Label.objects.filter(board=board))
+    
+    cards = Card.objects.filter(board=board, is_archived=False, list__is_archived=False)
+    if cards_per_list:
+        # One card past the window tells whether a list has more
+        cards = _first_cards(cards, cards_per_list + 1)
+    cards_by_list = defaultdict(list)
+    for card in _card_rows(cards):
+        cards_by_list[card.pop('list_id')].append(card)
+    
+    snapshot['lists'] = []
+    for lst in _list_rows(List.objects.filter(board=board, is_archived=False)):
+        list_cards = cards_by_list.get(lst['id'], [])
+        if cards_per_list:
+            lst['next_cursor'] = None
+            if len(list_cards) > cards_per_list:
+                list_cards = list_cards[:cards_per_list]
+                lst['next_cursor'] = encode_card_cursor(list_cards[-1])
+        snapshot['lists'].append(dict(lst, cards=list_cards))
+    return snapshot
+
+
+def build_list_cards_page(list_obj, cursor=None, limit=50):
+    """
+    Return the open cards of ``list_obj`` after ``cursor``, as snapshot rows.
+    
+    Pages are keyset ranges on the ``(list, position)`` index, so a page
+    deep into a long list costs the same as the first one.
+    """
+    cards = Card.objects.filter(list=list_obj, is_archived=False)
+    if cursor:
+        position, card_id = decode_card_cursor(cursor)
+        # The redundant bound on position keeps this an index range scan
+        cards = cards.filter(position__gte=position).filter(
+            Q(position__gt=position) | Q(id__gt=card_id)
+        )
+    
+    page_ids = list(cards.order_by('position', 'id').values_list('id', flat=True)[:limit + 1])
+    rows = _card_rows(Card.objects.filter(id__in=page_ids[:limit]))
+    return {
+        'cards': rows,
+        'next_cursor': encode_card_cursor(rows[-1]) if len(page_ids) > limit else None,
+    }
+
+
+def build_change_rows(board_id, changed, deleted):
+    """
+    Rows for the objects in ``changed`` and tombstones for ``deleted``.
+    
+    Both map an object type to a set of ids. Objects that are logged as
+    changed but are no longer on the board (moved away or deleted since)
+    are reported as deleted.
+    """
+    rows = {
+        'list': _list_rows(List.objects.filter(board_id=board_id, id__in=changed['list'])) if changed['list'] else [],
+        'card': _card_rows(Card.objects.filter(board_id=board_id, id__in=changed['card'])) if changed['card'] else [],
+        'label': _label_rows(Label.objects.filter(board_id=board_id, id__in=changed['label'])) if changed['label'] else [],
+        'member': _member_rows(
+            BoardMember.objects.filter(board_id=board_id, user_id__in=changed['member'])
+        ) if changed['member'] else [],
+    }
+    gone = {
+        object_type: deleted[object_type] | (changed[object_type] - {row['id'] for row in object_rows})
+        for object_type, object_rows in rows.items()
+    }
+    return {
+        'lists': rows['list'],
+        'cards': rows['card'],
+        'labels': rows['label'],
+        'members': rows['member'],
+        'deleted': {
+            'lists': sorted(gone['list'], key=str),
+            'cards': sorted(gone['card'], key=str),
+            'labels': sorted(gone['label'], key=str),
+            'members': sorted(gone['member'], key=str),
+        },
+    }
+
+
+def build_board_changes(board, since):
+    """
+    Return what changed on ``board`` after version ``since``.
+    
+    Created and updated objects (archived ones included, with
+    ``is_archived`` set) are returned in full; deleted objects, and objects
+    that have left the board, as tombstone ids under ``deleted``. Cost is
+    proportional to the number of changed objects, not to the board size.
+    ``board`` must have been read before calling, so that the returned
+    version never runs ahead of the changes.
+    """
+    changed = defaultdict(set)
+    deleted = defaultdict(set)
+    for object_type, object_id, is_deleted in BoardChange.objects.filter(
+        board=board,
+        version__gt=since
+    ).values_list('object_type', 'object_id', 'is_deleted'):
+        (deleted if is_deleted else changed)[object_type].add(object_id)
+    
+    return {
+        'version': board.version,
+        'since': since,
+        'board': _board_row(board) if changed['board'] else None,
+        **build_change_rows(board.pk, changed, deleted),
+    }
+
+
+def get_board_snapshot(board, cards_per_list=None):
+    """Return the snapshot of ``board`` at its current version, building it on a cache miss"""
+    key = f"board-snapshot:{board.pk}:{board.version}"
+    if cards_per_list:
+        key += f":{cards_per_list}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_board_snapshot(board, cards_per_list)
+        cache.set(key, snapshot, SNAPSHOT_CACHE_TIMEOUT)
+    return snapshot
@@ -0,0 +1,91 @@
+"""
+Board Statistics
+boards/stats.py
+
+Dashboard figures for one board: cards per list, completed versus open,
+overdue and due within the week, cards per member and per label, and
+checklist completion. Each breakdown is one grouped aggregate over the open
+cards of the board's open lists, so the cost is four queries whatever the
+size of the board.
+
+Stats are cached per board version like snapshots (see ``boards.snapshot``).
+Due-date figures also change with the clock, so entries are kept only
+briefly.
+"""
+
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from lists.models import List
+from cards.models import CardLabel, CardMember, ChecklistItem
+
+# Bounds how stale overdue and due-this-week counts can get
+STATS_CACHE_TIMEOUT = 5 * 60
+
+
+def build_board_stats(board):
+    """Aggregate the dashboard figures of ``board``"""
+    now = timezone.now()
+    open_card = Q(cards__is_archived=False)
+    not_done = open_card & Q(cards__is_completed=False)
+    # Grouped on lists so empty lists still show up
+    lists = list(
+        List.objects.filter(board=board, is_archived=False).annotate(
+            total=Count('cards', filter=open_card),
+            completed=Count('cards', filter=open_card & Q(cards__is_completed=True)),
+            overdue=Count('cards', filter=not_done & Q(cards__due_date__lt=now)),
+            due_this_week=Count('cards', filter=not_done & Q(
+                cards__due_date__gte=now,
+                cards__due_date__lt=now + timedelta(days=7)
+            ))
+        ).order_by('position').values(
+            'id', 'name', 'total', 'completed', 'overdue', 'due_this_week'
+        )
+    )
+    cards = {
+        field: sum(row[field] for row in lists)
+        for field in ('total', 'completed', 'overdue', 'due_this_week')
+    }
+    cards['open'] = cards['total'] - cards['completed']
+    
+    open_cards = {'card__board_id': board.pk, 'card__is_archived': False, 'card__list__is_archived': False}
+    members = list(
+        CardMember.objects.filter(**open_cards).values('user_id').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(card__is_completed=True))
+        ).order_by('-total')
+    )
+    labels = list(
+        CardLabel.objects.filter(**open_cards).values('label_id').annotate(
+            total=Count('id')
+        ).order_by('-total')
+    )
+    checklist_items = ChecklistItem.objects.filter(
+        board_id=board.pk,
+        checklist__card__is_archived=False,
+        checklist__card__list__is_archived=False
+    ).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(is_completed=True))
+    )
+    
+    return {
+        'version': board.version,
+        'generated_at': now,
+        'cards': cards,
+        'lists': lists,
+        'members': members,
+        'labels': labels,
+        'checklist_items': checklist_items,
+    }
+
+
+def get_board_stats(board):
+    """Return the stats of ``board`` at its current version, building them on a cache miss"""
+    key = f"board-stats:{board.pk}:{board.version}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_board_stats(board)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
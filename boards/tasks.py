@@ -0,0 +1,13 @@
+"""
+Board Tasks
+boards/tasks.py
+"""
+
+from django.tasks import task
+from .renormalize import renormalize_positions
+
+
+@task
+def renormalize_positions_task(batch_size=100, pause=0.1, limit=None):
+    """Scheduled position cleanup; enqueue periodically, e.g. nightly"""
+    return renormalize_positions(batch_size=batch_size, pause=pause, limit=limit)
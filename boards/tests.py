@@ -1,3 +1,794 @@
-from django.test import TestCase
+import asyncio
+import threading
+from datetime import timedelta
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.middleware import JWTAuthMiddleware
+from users.models import User
+from lists.models import List
+from workspaces.models import Workspace, WorkspaceMember
+from cards.models import Attachment, Card, CardLabel, CardMember, Checklist, ChecklistItem, Comment
+from .models import Board, BoardMember, BoardStar, Label
+from .renormalize import renormalize_positions
+from .presence import PRESENCE_BATCH, _connection_key, _registry_lock, join
+from .routing import websocket_urlpatterns
 
-# Create your tests here.
+
+class PositionAllocationTests(TestCase):
+    """Tests for boards.positions"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+    
+    def test_creates_take_consecutive_positions(self):
+        lists = [List.objects.create(board=self.board, name=f'List {i}') for i in range(3)]
+        self.assertEqual([lst.position for lst in lists], [1, 2, 3])
+        cards = [Card.objects.create(list=lists[0], title=f'Card {i}') for i in range(2)]
+        self.assertEqual([card.position for card in cards], [Card.POSITION_GAP, 2 * Card.POSITION_GAP])
+    
+    def test_bulk_create_numbers_each_parent_with_one_update(self):
+        first = List.objects.create(board=self.board, name='First')
+        second = List.objects.create(board=self.board, name='Second')
+        Card.objects.create(list=first, title='Existing')
+        cards = [Card(list=first, title='A'), Card(list=second, title='B'), Card(list=first, title='C')]
+        
+        # One counter UPDATE per parent, then the INSERT
+        with self.assertNumQueries(3):
+            Card.objects.bulk_create(cards)
+        
+        self.assertEqual(
+            [card.position / Card.POSITION_GAP for card in cards],
+            [2, 1, 3]
+        )
+        self.assertEqual(List.objects.get(pk=first.pk).card_position_seq, 3)
+        self.assertEqual(List.objects.get(pk=second.pk).card_position_seq, 1)
+    
+    def test_explicit_positions_are_kept(self):
+        lst = List.objects.create(board=self.board, name='List', position=10)
+        self.assertEqual(lst.position, 10)
+        self.assertEqual(Board.objects.get(pk=self.board.pk).list_position_seq, 0)
+    
+    def test_stale_save_does_not_rewind_counters(self):
+        stale_board = Board.objects.get(pk=self.board.pk)
+        stale_list = List.objects.create(board=self.board, name='List')
+        List.objects.create(board=self.board, name='Next')
+        Card.objects.create(list=stale_list, title='Card')
+        
+        stale_board.name = 'Renamed'
+        stale_board.save()
+        stale_list.name = 'Renamed'
+        stale_list.save()
+        
+        board = Board.objects.get(pk=self.board.pk)
+        self.assertEqual(board.name, 'Renamed')
+        self.assertEqual(board.list_position_seq, 2)
+        self.assertGreater(board.version, 0)
+        self.assertEqual(List.objects.get(pk=stale_list.pk).card_position_seq, 1)
+        self.assertEqual(List.objects.create(board=self.board, name='Last').position, 3)
+
+
+class ConcurrentPositionTests(TransactionTestCase):
+    """Creates racing on one parent never share a position"""
+    
+    def test_concurrent_creates_get_distinct_positions(self):
+        user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        board = Board.objects.create(name='Roadmap', created_by=user)
+        lst = List.objects.create(board=board, name='List')
+        errors = []
+        
+        def create_cards():
+            try:
+                for i in range(10):
+                    Card.objects.create(list_id=lst.pk, title=f'Card {i}')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=create_cards) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        positions = list(Card.objects.filter(list=lst).values_list('position', flat=True))
+        self.assertEqual(sorted(positions), [i * Card.POSITION_GAP for i in range(1, 41)])
+        self.assertEqual(List.objects.get(pk=lst.pk).card_position_seq, 40)
+
+
+class RenormalizePositionsTests(TestCase):
+    """Tests for boards.renormalize"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        self.lists = [List.objects.create(board=self.board, name=f'List {i}') for i in range(3)]
+        for j in range(3):
+            Card.objects.create(list=self.lists[0], title=f'Card {j}')
+    
+    def drift(self):
+        # A hole and a far-off list position, and colliding card positions
+        List.objects.filter(pk=self.lists[1].pk).delete()
+        List.objects.filter(pk=self.lists[2].pk).update(position=50)
+        Card.objects.filter(list=self.lists[0]).update(position=7.0)
+    
+    def list_positions(self, board=None):
+        return list(List.objects.filter(board=board or self.board).order_by('position').values_list('position', flat=True))
+    
+    def card_positions(self):
+        return sorted(Card.objects.filter(list=self.lists[0]).values_list('position', flat=True))
+    
+    def test_renumbers_drifted_lists_and_cards(self):
+        self.drift()
+        version = Board.objects.get(pk=self.board.pk).version
+        
+        result = renormalize_positions(pause=0)
+        
+        self.assertEqual(result, {'boards': 1, 'lists': 1, 'lists_renumbered': 1, 'cards_respaced': 3})
+        self.assertEqual(self.list_positions(), [1, 2])
+        self.assertEqual(self.card_positions(), [Card.POSITION_GAP * i for i in (1, 2, 3)])
+        self.assertGreater(Board.objects.get(pk=self.board.pk).version, version)
+        # New rows continue after the renumbered ones, and a second run finds nothing
+        self.assertEqual(List.objects.create(board=self.board, name='New').position, 3)
+        self.assertEqual(renormalize_positions(pause=0, dry_run=True)['boards'], 0)
+    
+    def test_dry_run_changes_nothing(self):
+        self.drift()
+        version = Board.objects.get(pk=self.board.pk).version
+        
+        result = renormalize_positions(pause=0, dry_run=True)
+        
+        self.assertEqual((result['boards'], result['lists']), (1, 1))
+        self.assertEqual(self.list_positions(), [1, 50])
+        self.assertEqual(self.card_positions(), [7.0, 7.0, 7.0])
+        self.assertEqual(Board.objects.get(pk=self.board.pk).version, version)
+    
+    def test_scans_in_batches_and_respects_limit(self):
+        boards = [Board.objects.create(name=f'Board {i}', created_by=self.user) for i in range(5)]
+        # Boards are scanned in primary key order
+        drifted = sorted(boards[::2], key=lambda board: board.pk)
+        for board in drifted:
+            List.objects.create(board=board, name='Only')
+            List.objects.filter(board=board).update(position=10)
+        
+        self.assertEqual(renormalize_positions(batch_size=2, pause=0, dry_run=True)['boards'], 3)
+        self.assertEqual(renormalize_positions(batch_size=2, pause=0, limit=2)['boards'], 2)
+        self.assertEqual(
+            [self.list_positions(board) for board in drifted],
+            [[1], [1], [10]]
+        )
+
+
+class BoardSnapshotTests(TestCase):
+    """Tests for GET /api/boards/{id}/snapshot/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_lists(self, lists, cards_per_list):
+        for i in range(lists):
+            lst = List.objects.create(board=self.board, name=f'List {i}')
+            for j in range(cards_per_list):
+                card = Card.objects.create(list=lst, title=f'Card {j}', created_by=self.user)
+                CardLabel.objects.create(card=card, label=self.label)
+                CardMember.objects.create(card=card, user=self.user, assigned_by=self.user)
+                checklist = Checklist.objects.create(card=card, title='Todo')
+                ChecklistItem.objects.create(checklist=checklist, title='Step', is_completed=True)
+                Comment.objects.create(card=card, user=self.user, content='Looks good')
+    
+    def get_snapshot(self):
+        return self.client.get(f'/api/boards/{self.board.id}/snapshot/')
+    
+    def test_snapshot_contents(self):
+        self.add_lists(2, 2)
+        List.objects.create(board=self.board, name='Archived', is_archived=True)
+        Card.objects.filter(title='Card 1').update(is_archived=True)
+        
+        response = self.get_snapshot()
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([member['id'] for member in data['members']], [str(self.user.id)])
+        self.assertEqual([label['id'] for label in data['labels']], [str(self.label.id)])
+        self.assertEqual([lst['name'] for lst in data['lists']], ['List 0', 'List 1'])
+        card = data['lists'][0]['cards'][0]
+        self.assertEqual(len(data['lists'][0]['cards']), 1)
+        self.assertEqual(card['label_ids'], [str(self.label.id)])
+        self.assertEqual(card['member_ids'], [str(self.user.id)])
+        self.assertEqual(card['checklist_items_completed_count'], 1)
+        self.assertEqual(card['comments_count'], 1)
+    
+    def test_query_count_is_constant(self):
+        self.add_lists(1, 1)
+        with self.assertNumQueries(7):
+            self.get_snapshot()
+        
+        self.add_lists(5, 10)
+        with self.assertNumQueries(7):
+            self.get_snapshot()
+    
+    def test_warm_snapshot_is_served_from_cache(self):
+        self.add_lists(2, 3)
+        self.get_snapshot()
+        
+        with self.assertNumQueries(1):
+            response = self.get_snapshot()
+        
+        self.assertEqual(len(response.json()['lists']), 2)
+    
+    def test_writes_bump_version_and_refresh_snapshot(self):
+        self.add_lists(1, 1)
+        first = self.get_snapshot().json()
+        card = Card.objects.get()
+        
+        card.title = 'Renamed'
+        card.save()
+        CardLabel.objects.filter(card=card).delete()
+        second = self.get_snapshot().json()
+        
+        self.assertGreater(second['version'], first['version'])
+        self.assertEqual(second['lists'][0]['cards'][0]['title'], 'Renamed')
+        self.assertEqual(second['lists'][0]['cards'][0]['label_ids'], [])
+    
+    def test_saving_stale_board_keeps_version_moving_forward(self):
+        board = Board.objects.get(pk=self.board.pk)
+        List.objects.create(board=self.board, name='Backlog')
+        version = Board.objects.get(pk=self.board.pk).version
+        
+        board.name = 'Renamed'
+        board.save()
+        
+        self.assertEqual(Board.objects.get(pk=self.board.pk).version, version + 1)
+    
+    def test_cards_per_list_windows_each_list(self):
+        self.add_lists(2, 5)
+        lst = List.objects.get(name='List 0')
+        Card.objects.create(list=List.objects.get(name='List 1'), title='Gone', is_archived=True, created_by=self.user)
+        
+        with self.assertNumQueries(7):
+            data = self.client.get(f'/api/boards/{self.board.pk}/snapshot/?cards_per_list=3').json()
+        self.assertEqual([len(lst_row['cards']) for lst_row in data['lists']], [3, 3])
+        self.assertEqual([card['title'] for card in data['lists'][0]['cards']], ['Card 0', 'Card 1', 'Card 2'])
+        
+        # Follow the list's cursor to the end
+        titles = []
+        cursor = data['lists'][0]['next_cursor']
+        while cursor:
+            page = self.client.get(f'/api/lists/{lst.pk}/cards/', {'cursor': cursor, 'limit': 1}).json()
+            titles += [card['title'] for card in page['cards']]
+            cursor = page['next_cursor']
+        self.assertEqual(titles, ['Card 3', 'Card 4'])
+        
+        data = self.client.get(f'/api/boards/{self.board.pk}/snapshot/?cards_per_list=5').json()
+        self.assertEqual([lst_row['next_cursor'] for lst_row in data['lists']], [None, None])
+        self.assertEqual(
+            self.client.get(f'/api/boards/{self.board.pk}/snapshot/?cards_per_list=0').status_code, 400
+        )
+        self.assertEqual(self.client.get(f'/api/lists/{lst.pk}/cards/?cursor=bogus').status_code, 400)
+    
+    def test_non_member_cannot_read_snapshot(self):
+        outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        self.client.force_authenticate(outsider)
+        
+        response = self.get_snapshot()
+        
+        self.assertEqual(response.status_code, 404)
+
+
+class MemberScopingTests(TestCase):
+    """Board-scoped rows are visible to the board's members only, each exactly once"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        colleague = User.objects.create_user('colleague@example.com', 'colleague', 'password123!')
+        workspace = Workspace.objects.create(name='Acme', slug='acme', owner=self.user)
+        # A member of both the workspace and the board, next to other members of each
+        for user in (self.user, colleague):
+            WorkspaceMember.objects.create(workspace=workspace, user=user)
+        board = Board.objects.create(name='Roadmap', workspace=workspace, created_by=self.user)
+        for user in (self.user, colleague):
+            BoardMember.objects.create(board=board, user=user)
+        lst = List.objects.create(board=board, name='Todo')
+        card = Card.objects.create(list=lst, title='Ship it', created_by=self.user)
+        checklist = Checklist.objects.create(card=card, title='Steps')
+        self.rows = {
+            '/api/boards/': board,
+            '/api/lists/': lst,
+            '/api/cards/': card,
+            '/api/cards/checklists/': checklist,
+            '/api/cards/checklist-items/': ChecklistItem.objects.create(checklist=checklist, title='Step'),
+            '/api/cards/comments/': Comment.objects.create(card=card, user=self.user, content='Looks good'),
+            '/api/cards/attachments/': Attachment.objects.create(
+                card=card,
+                file_name='spec.pdf',
+                file_url='https://example.com/spec.pdf'
+            ),
+        }
+        self.label = Label.objects.create(board=board, name='Bug', color='#f00')
+        self.client = APIClient()
+    
+    def listed_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        data = response.json()
+        return [row['id'] for row in (data['results'] if isinstance(data, dict) else data)]
+    
+    def test_non_member_sees_nothing(self):
+        self.client.force_authenticate(self.outsider)
+        
+        for url, row in self.rows.items():
+            self.assertEqual(self.listed_ids(url), [], url)
+            self.assertEqual(self.client.get(f'{url}{row.id}/').status_code, 404, url)
+        self.assertEqual(self.client.get(f'/api/boards/labels/{self.label.id}/').status_code, 404)
+    
+    def test_member_sees_each_row_once(self):
+        self.client.force_authenticate(self.user)
+        
+        for url, row in self.rows.items():
+            self.assertEqual(self.listed_ids(url), [str(row.id)], url)
+            self.assertEqual(self.client.get(f'{url}{row.id}/').status_code, 200, url)
+        self.assertEqual(self.client.get(f'/api/boards/labels/{self.label.id}/').status_code, 200)
+
+
+class BoardListTests(TestCase):
+    """Tests for GET /api/boards/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.other = User.objects.create_user('other@example.com', 'other', 'password123!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_board(self, name, lists=2, starred=False):
+        board = Board.objects.create(name=name, created_by=self.user)
+        BoardMember.objects.create(board=board, user=self.user, role='admin')
+        BoardMember.objects.create(board=board, user=self.other, role='member')
+        for i in range(lists):
+            List.objects.create(board=board, name=f'List {i}')
+        List.objects.create(board=board, name='Old', is_archived=True)
+        if starred:
+            BoardStar.objects.create(board=board, user=self.user)
+        return board
+    
+    def test_counts_are_annotated(self):
+        starred = self.add_board('Starred', lists=3, starred=True)
+        self.add_board('Plain')
+        BoardStar.objects.create(board=starred, user=self.other)
+        
+        response = self.client.get('/api/boards/')
+        self.assertEqual(response.status_code, 200)
+        boards = {row['name']: row for row in response.data['results']}
+        self.assertEqual(boards['Starred']['lists_count'], 3)
+        self.assertEqual(boards['Starred']['members_count'], 2)
+        self.assertTrue(boards['Starred']['is_starred_by_user'])
+        self.assertEqual(boards['Plain']['lists_count'], 2)
+        self.assertFalse(boards['Plain']['is_starred_by_user'])
+        self.assertEqual(boards['Plain']['created_by']['email'], 'owner@example.com')
+    
+    def test_query_count_is_independent_of_board_count(self):
+        for i in range(10):
+            self.add_board(f'Board {i}', starred=i % 2 == 0)
+        # Page count and page rows
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/boards/')
+        self.assertEqual(len(response.data['results']), 10)
+    
+    def test_counts_keep_newest_first_order(self):
+        for i in range(3):
+            self.add_board(f'Board {i}', lists=i)
+        
+        response = self.client.get('/api/boards/')
+        
+        rows = response.data['results']
+        self.assertEqual([row['name'] for row in rows], ['Board 2', 'Board 1', 'Board 0'])
+        self.assertEqual([row['lists_count'] for row in rows], [2, 1, 0])
+        self.assertEqual({row['members_count'] for row in rows}, {2})
+
+
+class BoardStatsTests(TestCase):
+    """Tests for GET /api/boards/{id}/stats/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.todo = List.objects.create(board=self.board, name='Todo')
+        self.done = List.objects.create(board=self.board, name='Done')
+        self.empty = List.objects.create(board=self.board, name='Empty')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_stats(self):
+        now = timezone.now()
+        overdue = Card.objects.create(list=self.todo, title='Late', due_date=now - timedelta(days=1), created_by=self.user)
+        Card.objects.create(list=self.todo, title='Soon', due_date=now + timedelta(days=2), created_by=self.user)
+        Card.objects.create(list=self.todo, title='Later', due_date=now + timedelta(days=30), created_by=self.user)
+        finished = Card.objects.create(list=self.done, title='Shipped', is_completed=True, created_by=self.user)
+        Card.objects.create(list=self.done, title='Old', is_archived=True, created_by=self.user)
+        for card in (overdue, finished):
+            CardMember.objects.create(card=card, user=self.user, assigned_by=self.user)
+            CardLabel.objects.create(card=card, label=self.label)
+        checklist = Checklist.objects.create(card=overdue, title='Todo')
+        ChecklistItem.objects.create(checklist=checklist, title='One', is_completed=True)
+        ChecklistItem.objects.create(checklist=checklist, title='Two')
+        
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/api/boards/{self.board.pk}/stats/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['cards'], {'total': 4, 'completed': 1, 'open': 3, 'overdue': 1, 'due_this_week': 1})
+        self.assertEqual(
+            [(row['name'], row['total']) for row in data['lists']],
+            [('Todo', 3), ('Done', 1), ('Empty', 0)]
+        )
+        self.assertEqual(data['members'], [{'user_id': self.user.pk, 'total': 2, 'completed': 1}])
+        self.assertEqual(data['labels'], [{'label_id': self.label.pk, 'total': 2}])
+        self.assertEqual(data['checklist_items'], {'total': 2, 'completed': 1})
+        
+        # Served from the cache until the board changes
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/boards/{self.board.pk}/stats/')
+        finished.is_completed = False
+        finished.save()
+        response = self.client.get(f'/api/boards/{self.board.pk}/stats/')
+        self.assertEqual(response.data['cards']['completed'], 0)
+
+
+class PublicBoardTests(TestCase):
+    """Tests for GET /api/boards/public/{id}/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', visibility='public', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        lst = List.objects.create(board=self.board, name='Todo')
+        card = Card.objects.create(list=lst, title='Ship it', created_by=self.user)
+        CardMember.objects.create(card=card, user=self.user, assigned_by=self.user)
+        self.client = APIClient()
+        self.url = f'/api/boards/public/{self.board.pk}/'
+    
+    def test_anonymous_read_is_cached(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertNotIn('members', data)
+        self.assertEqual(data['lists'][0]['cards'][0]['title'], 'Ship it')
+        self.assertNotIn('member_ids', data['lists'][0]['cards'][0])
+        self.assertIn('public', response['Cache-Control'])
+        
+        with self.assertNumQueries(0):
+            warm = self.client.get(self.url)
+        self.assertEqual(warm.json(), data)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=warm['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_if_none_match_is_parsed(self):
+        etag = self.client.get(self.url)['ETag']
+        stale = etag.replace('"', '') + '0'
+        
+        for header, status in [
+            (etag, 304),
+            (f'W/{etag}', 304),
+            (f'"{stale}", {etag}', 304),
+            ('*', 304),
+            (f'"{stale}"', 200),
+            # Contains the current tag without being it
+            (f'{etag}x', 200),
+        ]:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, status, header)
+            self.assertEqual(response['ETag'], etag)
+    
+    def test_private_boards_are_not_served(self):
+        self.client.get(self.url)
+        self.board.visibility = 'private'
+        self.board.save()
+        
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class BoardChangesTests(TestCase):
+    """Tests for GET /api/boards/{id}/changes/?since=<version>"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.card = Card.objects.create(list=self.list, title='First', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def current_version(self):
+        return Board.objects.get(pk=self.board.pk).version
+    
+    def get_changes(self, since):
+        return self.client.get(f'/api/boards/{self.board.id}/changes/', {'since': since})
+    
+    def test_returns_only_objects_changed_since_version(self):
+        since = self.current_version()
+        self.card.title = 'Renamed'
+        self.card.save()
+        label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        
+        data = self.get_changes(since).json()
+        
+        self.assertEqual(data['version'], self.current_version())
+        self.assertEqual([card['title'] for card in data['cards']], ['Renamed'])
+        self.assertEqual([row['id'] for row in data['labels']], [str(label.id)])
+        self.assertEqual(data['lists'], [])
+        self.assertIsNone(data['board'])
+    
+    def test_deleted_and_moved_objects_come_back_as_tombstones(self):
+        other_board = Board.objects.create(name='Other', created_by=self.user)
+        other_list = List.objects.create(board=other_board, name='Elsewhere')
+        second = Card.objects.create(list=self.list, title='Second', created_by=self.user)
+        second_id = second.id
+        since = self.current_version()
+        
+        second.delete()
+        self.card.list = other_list
+        self.card.save()
+        
+        data = self.get_changes(since).json()
+        
+        self.assertEqual(data['cards'], [])
+        self.assertEqual(sorted(data['deleted']['cards']), sorted([str(second_id), str(self.card.id)]))
+    
+    def test_card_details_mark_the_card_changed(self):
+        since = self.current_version()
+        Comment.objects.create(card=self.card, user=self.user, content='Ping')
+        
+        data = self.get_changes(since).json()
+        
+        self.assertEqual(data['cards'][0]['comments_count'], 1)
+    
+    def test_compacted_log_requires_full_resync(self):
+        since = self.current_version()
+        self.card.save()
+        Board.objects.filter(pk=self.board.pk).update(compacted_version=since + 1)
+        
+        response = self.get_changes(since)
+        
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['resync'])
+    
+    def test_query_count_does_not_grow_with_board_size(self):
+        for i in range(30):
+            Card.objects.create(list=self.list, title=f'Card {i}', created_by=self.user)
+        since = self.current_version()
+        self.card.title = 'Renamed'
+        self.card.save()
+        
+        with self.assertNumQueries(5):
+            data = self.get_changes(since).json()
+        
+        self.assertEqual(len(data['cards']), 1)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class PresenceLockTests(TestCase):
+    """Tests for the presence registry lock"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    async def test_waiter_times_out_without_releasing_the_lock(self):
+        async with _registry_lock('board'):
+            with self.assertRaises(TimeoutError):
+                async with _registry_lock('board'):
+                    pass
+            self.assertIsNotNone(await cache.aget('board-presence-lock:board'))
+        self.assertIsNone(await cache.aget('board-presence-lock:board'))
+    
+    async def test_expired_holder_leaves_the_next_lock_alone(self):
+        async with _registry_lock('board'):
+            # Expired and taken by someone else meanwhile
+            await cache.aset('board-presence-lock:board', 'other holder', 5)
+        self.assertEqual(await cache.aget('board-presence-lock:board'), 'other holder')
+
+
+class BoardConsumerTests(TransactionTestCase):
+    """Tests for the ws/boards/{id}/ live update socket"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+    
+    def communicator(self, user=None):
+        path = f'/ws/boards/{self.board.pk}/'
+        if user is not None:
+            path += f'?token={AccessToken.for_user(user)}'
+        return WebsocketCommunicator(self.application, path)
+    
+    async def test_rejects_anonymous_and_non_members(self):
+        for user in (None, self.outsider):
+            communicator = self.communicator(user)
+            connected, _ = await communicator.connect()
+            self.assertFalse(connected)
+    
+    async def test_member_receives_committed_changes(self):
+        communicator = self.communicator(self.user)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from(timeout=2)  # Own presence
+        
+        card = await database_sync_to_async(Card.objects.create)(
+            list=self.list, title='Ship it', created_by=self.user
+        )
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event['type'], 'board.changes')
+        self.assertEqual(event['board_id'], str(self.board.pk))
+        self.assertEqual(event['changed']['cards'], [str(card.pk)])
+        self.assertEqual(event['deleted']['cards'], [])
+        
+        card_id = str(card.pk)
+        await database_sync_to_async(card.delete)()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event['deleted']['cards'], [card_id])
+        self.assertGreater(event['version'], 0)
+        await communicator.disconnect()
+    
+    async def test_one_event_per_transaction(self):
+        communicator = self.communicator(self.user)
+        await communicator.connect()
+        await communicator.receive_json_from(timeout=2)  # Own presence
+        
+        def write_twice():
+            with transaction.atomic():
+                first = Card.objects.create(list=self.list, title='First', created_by=self.user)
+                second = Card.objects.create(list=self.list, title='Second', created_by=self.user)
+                first_id = first.pk
+                first.delete()
+            return first_id, second.pk
+        
+        first_id, second_id = await database_sync_to_async(write_twice)()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event['changed']['cards'], [str(second_id)])
+        self.assertEqual(event['deleted']['cards'], [str(first_id)])
+        self.assertEqual(event['version'], (await Board.objects.aget(pk=self.board.pk)).version)
+        self.assertTrue(await communicator.receive_nothing())
+        
+        # Nothing is sent for a rolled back transaction
+        def roll_back():
+            with transaction.atomic():
+                Card.objects.create(list=self.list, title='Gone', created_by=self.user)
+                transaction.set_rollback(True)
+        
+        await database_sync_to_async(roll_back)()
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+    
+    async def test_rolled_back_savepoint_is_not_sent(self):
+        communicator = self.communicator(self.user)
+        await communicator.connect()
+        await communicator.receive_json_from(timeout=2)  # Own presence
+        
+        def roll_back_savepoint(keep):
+            with transaction.atomic():
+                kept = Card.objects.create(list=self.list, title='Kept', created_by=self.user) if keep else None
+                try:
+                    with transaction.atomic():
+                        Card.objects.create(list=self.list, title='Gone', created_by=self.user)
+                        raise ValueError
+                except ValueError:
+                    pass
+                with transaction.atomic():
+                    later = Card.objects.create(list=self.list, title='Later', created_by=self.user) if keep else None
+            return kept and kept.pk, later and later.pk
+        
+        await database_sync_to_async(roll_back_savepoint)(False)
+        self.assertTrue(await communicator.receive_nothing())
+        
+        kept_id, later_id = await database_sync_to_async(roll_back_savepoint)(True)
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(sorted(event['changed']['cards']), sorted([str(kept_id), str(later_id)]))
+        self.assertEqual(event['version'], (await Board.objects.aget(pk=self.board.pk)).version)
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+    
+    async def test_released_savepoint_joins_the_transaction_event(self):
+        communicator = self.communicator(self.user)
+        await communicator.connect()
+        await communicator.receive_json_from(timeout=2)  # Own presence
+        
+        def write_around_savepoint():
+            with transaction.atomic():
+                first = Card.objects.create(list=self.list, title='First', created_by=self.user)
+                with transaction.atomic():
+                    second = Card.objects.create(list=self.list, title='Second', created_by=self.user)
+                third = Card.objects.create(list=self.list, title='Third', created_by=self.user)
+            return {str(first.pk), str(second.pk), str(third.pk)}
+        
+        card_ids = await database_sync_to_async(write_around_savepoint)()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(set(event['changed']['cards']), card_ids)
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+    
+    async def test_presence_follows_sockets(self):
+        communicator = self.communicator(self.user)
+        await communicator.connect()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event, {'type': 'presence.changed', 'joined': [str(self.user.pk)], 'left': []})
+        
+        # Later heartbeats only extend the presence
+        await communicator.send_json_to({'type': 'heartbeat'})
+        self.assertTrue(await communicator.receive_nothing())
+        
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = await database_sync_to_async(client.get)(f'/api/boards/{self.board.pk}/presence/')
+        self.assertEqual(response.json()['user_ids'], [str(self.user.pk)])
+        
+        await communicator.disconnect()
+        response = await database_sync_to_async(client.get)(f'/api/boards/{self.board.pk}/presence/')
+        self.assertEqual(response.json()['users'], [])
+    
+    async def connected_observer(self):
+        """A second member's socket, past its own join event"""
+        observer = await database_sync_to_async(User.objects.create_user)(
+            'observer@example.com', 'observer', 'password123!'
+        )
+        await BoardMember.objects.acreate(board=self.board, user=observer)
+        communicator = self.communicator(observer)
+        await communicator.connect()
+        event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event['joined'], [str(observer.pk)])
+        return communicator
+    
+    async def test_user_leaves_with_last_socket(self):
+        observer = await self.connected_observer()
+        first_tab = self.communicator(self.user)
+        await first_tab.connect()
+        # Batched: sent once the window opened by the observer's own join has passed
+        event = await observer.receive_json_from(timeout=PRESENCE_BATCH + 2)
+        self.assertEqual(event, {'type': 'presence.changed', 'joined': [str(self.user.pk)], 'left': []})
+        
+        second_tab = self.communicator(self.user)
+        await second_tab.connect()
+        self.assertTrue(await observer.receive_nothing(timeout=PRESENCE_BATCH + 0.5))
+        await first_tab.disconnect()
+        self.assertTrue(await observer.receive_nothing(timeout=PRESENCE_BATCH + 0.5))
+        
+        await second_tab.disconnect()
+        event = await observer.receive_json_from(timeout=PRESENCE_BATCH + 2)
+        self.assertEqual(event, {'type': 'presence.changed', 'joined': [], 'left': [str(self.user.pk)]})
+        await observer.disconnect()
+    
+    async def test_expired_socket_is_announced_as_left(self):
+        observer = await self.connected_observer()
+        # A socket whose client crashed: registered, then never heard from again
+        await join(self.board.pk, self.user.pk, 'crashed-channel')
+        await asyncio.sleep(PRESENCE_BATCH + 0.1)
+        await observer.send_json_to({'type': 'heartbeat'})
+        event = await observer.receive_json_from(timeout=2)
+        self.assertEqual(event['joined'], [str(self.user.pk)])
+        
+        await cache.adelete(_connection_key(self.board.pk, 'crashed-channel'))  # PRESENCE_TTL ran out
+        await asyncio.sleep(PRESENCE_BATCH + 0.1)
+        await observer.send_json_to({'type': 'heartbeat'})
+        event = await observer.receive_json_from(timeout=2)
+        self.assertEqual(event, {'type': 'presence.changed', 'joined': [], 'left': [str(self.user.pk)]})
+        await observer.disconnect()
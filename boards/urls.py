@@ -5,12 +5,13 @@ boards/urls.py
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BoardViewSet, LabelViewSet
+from .views import BoardViewSet, LabelViewSet, PublicBoardView
 
 router = DefaultRouter()
 router.register(r'', BoardViewSet, basename='board')
 router.register(r'labels', LabelViewSet, basename='label')
 
 urlpatterns = [
+    path('public/<uuid:pk>/', PublicBoardView.as_view(), name='public-board'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Board Versioning
+boards/versioning.py
+
+Every board carries a monotonically increasing ``version``. Saving or
+deleting the board, or a list, card, label, membership or card detail on
+it, moves the board to its next version and logs what changed in
+``BoardChange``, which keeps only the latest change per object:
+
+- ``(board_id, version)`` names exactly one state of the board, so renders
+  cached under that pair never need to be invalidated;
+- ``BoardChange`` rows newer than a client's version are exactly what the
+  client is missing (see ``boards.snapshot.build_board_changes``);
+- the same changes are pushed to open sockets after commit (see
+  ``boards.events``).
+
+The version is taken with ``UPDATE ... RETURNING``, which keeps the board
+row locked until commit, so versions on one board commit in order.
+
+Lock order: the board row is the last lock a transaction takes. Lists are
+locked first (several of them in primary-key order), then cards and card
+details are written, and only then are changes recorded; the signal
+receivers already run after the row they log is written. Operations that
+change several boards record them through ``record_changes_by_board``, in
+primary-key order. The one exception, handing out list positions from
+``Board.list_position_seq``, only writes rows nobody else can see yet.
+
+Signals cover single-row ``save()`` and ``delete()``. Code that writes with
+``QuerySet.update()``, ``bulk_create()`` or raw SQL, and code that deletes
+many rows (cascades included), runs under ``muted_board_changes()`` and
+calls ``record_board_changes`` itself, once per operation.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from .events import publish_board_changes
+from .models import Board, BoardChange
+from .positions import allocate_positions
+
+# Models synced as objects of their own: sender -> (object type, id attribute)
+TRACKED_MODELS = {
+    'boards.BoardMember': ('member', 'user_id'),
+    'boards.Label': ('label', 'id'),
+    'lists.List': ('list', 'id'),
+    'cards.Card': ('card', 'id'),
+}
+# Card details: a change shows up as a change to the card (badges, label and member ids)
+CARD_DETAIL_MODELS = [
+    'cards.CardLabel',
+    'cards.CardMember',
+    'cards.Checklist',
+    'cards.ChecklistItem',
+    'cards.Comment',
+    'cards.Attachment',
+]
+
+# Set while an operation logs its own changes; the signal receivers stand down
+_muted = ContextVar('board_changes_muted', default=False)
+
+
+@contextmanager
+def muted_board_changes():
+    """Skip the per-row signal receivers; the caller records the operation's changes"""
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def record_board_changes(board_id, changes):
+    """
+    Move a board to its next version and log ``changes`` at that version.
+    
+    ``changes`` is an iterable of ``(object_type, object_id, is_deleted)``;
+    the last entry for an object wins. Returns the new version, or None if
+    the board no longer exists.
+    """
+    if board_id is None:
+        return None
+    try:
+        version = allocate_positions(Board, board_id, 'version')
+    except Board.DoesNotExist:
+        return None
+    
+    latest = {(object_type, object_id): is_deleted for object_type, object_id, is_deleted in changes}
+    if latest:
+        now = timezone.now()
+        BoardChange.objects.bulk_create(
+            [
+                BoardChange(
+                    board_id=board_id,
+                    object_type=object_type,
+                    object_id=object_id,
+                    version=version,
+                    is_deleted=is_deleted,
+                    changed_at=now
+                )
+                for (object_type, object_id), is_deleted in latest.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['board', 'object_type', 'object_id'],
+            update_fields=['version', 'is_deleted', 'changed_at']
+        )
+        publish_board_changes(
+            board_id,
+            version,
+            [(object_type, object_id, is_deleted) for (object_type, object_id), is_deleted in latest.items()]
+        )
+    return version
+
+
+def record_changes_by_board(changes_by_board):
+    """Record ``{board_id: changes}`` for several boards, taking the board rows in primary-key order"""
+    for board_id in sorted(board_id for board_id in changes_by_board if board_id is not None):
+        record_board_changes(board_id, changes_by_board[board_id])
+
+
+def _board_changed(sender, instance, created=False, **kwargs):
+    if not created and not _muted.get():
+        record_board_changes(instance.pk, [('board', instance.pk, False)])
+
+
+def _tracked_changed(sender, instance, signal, **kwargs):
+    if _muted.get():
+        return
+    object_type, id_attr = TRACKED_MODELS[sender._meta.label]
+    record_board_changes(
+        instance.board_id,
+        [(object_type, getattr(instance, id_attr), signal is post_delete)]
+    )
+
+
+def _card_detail_changed(sender, instance, **kwargs):
+    if _muted.get():
+        return
+    if hasattr(instance, 'card_id'):
+        card_id = instance.card_id
+    else:
+        card_id = instance.checklist.card_id
+    board_id = instance.board_id
+    if board_id is None:
+        # Row written before the board was denormalized onto it
+        card_model = apps.get_model('cards', 'Card')
+        board_id = card_model.objects.filter(pk=card_id).values_list('board_id', flat=True).first()
+    record_board_changes(board_id, [('card', card_id, False)])
+
+
+def connect_signals():
+    """Connect the change recorders; called from BoardsConfig.ready()"""
+    post_save.connect(_board_changed, sender=Board, dispatch_uid='board_changes_board')
+    for signal in (post_save, post_delete):
+        for label in TRACKED_MODELS:
+            signal.connect(_tracked_changed, sender=label, dispatch_uid=f'board_changes_{label}')
+        for label in CARD_DETAIL_MODELS:
+            signal.connect(_card_detail_changed, sender=label, dispatch_uid=f'board_changes_{label}')
@@ -6,18 +6,47 @@ boards/views.py
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db.models import Count, Exists, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 from .models import Board, BoardMember, BoardStar, Label
+from lists.models import List
 from users.models import User
+from users.serializers import UserSerializer
+from workspaces.models import Workspace
+from cards.copying import copy_board
+from .snapshot import MAX_CARDS_PER_LIST, build_board_changes, get_board_snapshot
+from .stats import get_board_stats
+from .presence import present_user_ids
+from .public import (
+    PUBLIC_BOARD_MAX_AGE, etag_matches, get_public_board, get_public_board_version, public_board_etag
+)
 from .serializers import (
     BoardSerializer,
     BoardDetailSerializer,
     BoardMemberSerializer,
     AddBoardMemberSerializer,
+    CopyBoardSerializer,
     LabelSerializer
 )
 
 
+def _count_for_board(queryset):
+    """Correlated COUNT subquery over ``queryset`` for the outer board row"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(board=OuterRef('pk'))
+            .order_by()
+            .values('board')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0
+    )
+
+
 class BoardViewSet(viewsets.ModelViewSet):
     """ViewSet for Board operations"""
     
@@ -25,9 +54,7 @@ class BoardViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return boards where user is a member"""
-        queryset = Board.objects.filter(
-            members=self.request.user
-        ).distinct()
+        queryset = Board.objects.visible_to(self.request.user)
         
         # Filter by workspace if provided
         workspace_id = self.request.query_params.get('workspace')
@@ -41,8 +68,26 @@ class BoardViewSet(viewsets.ModelViewSet):
         else:
             queryset = queryset.filter(is_archived=False)
         
+        if self.action in ('list', 'retrieve'):
+            queryset = self.annotate_counts(queryset)
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('board_members', BoardMember.objects.select_related('user')),
+                'labels'
+            )
         return queryset
     
+    def annotate_counts(self, queryset):
+        """Compute the serializer's counts and star flag in the board query itself"""
+        return queryset.select_related('created_by').annotate(
+            # Correlated subqueries: joining both relations would multiply rows
+            lists_count=_count_for_board(List.objects.filter(is_archived=False)),
+            members_count=_count_for_board(BoardMember.objects.all()),
+            is_starred_by_user=Exists(
+                BoardStar.objects.filter(board=OuterRef('pk'), user=self.request.user)
+            )
+        )
+    
     def get_serializer_class(self):
         """Return appropriate serializer"""
         if self.action == 'retrieve':
@@ -103,6 +148,86 @@ class BoardViewSet(viewsets.ModelViewSet):
                 'message': 'Board was not starred'
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['post'])
+    def copy(self, request, pk=None):
+        """Copy board, or create a new board from a template"""
+        board = self.get_object()
+        serializer = CopyBoardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        workspace = None
+        if data.get('workspace'):
+            workspace = get_object_or_404(
+                Workspace.objects.visible_to(request.user),
+                id=data['workspace']
+            )
+        
+        new_board = copy_board(board, request.user, name=data.get('name'), workspace=workspace)
+        return Response(
+            BoardSerializer(new_board, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=True, methods=['get'])
+    def snapshot(self, request, pk=None):
+        """Get the board with its members, labels, open lists and cards in one payload"""
+        board = self.get_object()
+        
+        # ?cards_per_list=N windows each list to its first N cards
+        cards_per_list = request.query_params.get('cards_per_list')
+        if cards_per_list is not None:
+            try:
+                cards_per_list = int(cards_per_list)
+            except ValueError:
+                cards_per_list = 0
+            if not 0 < cards_per_list <= MAX_CARDS_PER_LIST:
+                return Response(
+                    {'error': f'cards_per_list must be between 1 and {MAX_CARDS_PER_LIST}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(get_board_snapshot(board, cards_per_list))
+    
+    @action(detail=True, methods=['get'])
+    def presence(self, request, pk=None):
+        """Get the members currently viewing the board"""
+        board = self.get_object()
+        members = list(User.objects.filter(board_memberships__board=board))
+        present = set(present_user_ids(board.pk, [user.pk for user in members]))
+        users = [user for user in members if user.pk in present]
+        return Response({
+            'user_ids': [user.pk for user in users],
+            'users': UserSerializer(users, many=True).data
+        })
+    
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Get dashboard counts for the board's open lists and cards"""
+        board = self.get_object()
+        return Response(get_board_stats(board))
+    
+    @action(detail=True, methods=['get'])
+    def changes(self, request, pk=None):
+        """Get the lists, cards, labels and members changed since ?since=<version>"""
+        board = self.get_object()
+        try:
+            since = int(request.query_params['since'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'since must be a board version'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The log no longer reaches back that far (or the client is ahead of it)
+        if since < board.compacted_version or since > board.version:
+            return Response({
+                'error': 'Full resync required',
+                'resync': True,
+                'version': board.version
+            }, status=status.HTTP_410_GONE)
+        
+        return Response(build_board_changes(board, since))
+    
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
         """Get board members"""
@@ -224,6 +349,32 @@ class LabelViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return labels for boards where user is a member"""
-        return Label.objects.filter(
-            board__members=self.request.user
-        ).distinct()
\ No newline at end of file
+        return Label.objects.visible_to(self.request.user)
+
+
+class PublicBoardView(APIView):
+    """Read-only view of a public board for anyone, signed in or not"""
+    
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request, pk):
+        """Get a public board with its open lists and cards"""
+        not_found = Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
+        version = get_public_board_version(pk)
+        if version is None:
+            return not_found
+        
+        etag = public_board_etag(pk, version)
+        if etag_matches(etag, request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            payload = get_public_board(pk, version)
+            if payload is None:
+                return not_found
+            etag = public_board_etag(pk, payload['version'])
+            response = Response(payload)
+        
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=PUBLIC_BOARD_MAX_AGE)
+        return response
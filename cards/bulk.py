@@ -0,0 +1,123 @@
+"""
+Bulk Card Operations
+cards/bulk.py
+
+Apply one operation to many cards with set-based statements: a single
+UPDATE, INSERT or DELETE per operation instead of one save() per card.
+"""
+
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Case, FloatField, Value, When
+from django.utils import timezone
+from boards.positions import allocate_positions
+from boards.versioning import muted_board_changes, record_changes_by_board
+from lists.models import List
+from .models import Card, CardMember, CardLabel
+
+
+def _archive(cards, **kwargs):
+    now = timezone.now()
+    return cards.filter(is_archived=False).update(is_archived=True, archived_at=now, updated_at=now)
+
+
+def _restore(cards, **kwargs):
+    return cards.filter(is_archived=True).update(is_archived=False, archived_at=None, updated_at=timezone.now())
+
+
+def _complete(cards, **kwargs):
+    return cards.filter(is_completed=False).update(is_completed=True, updated_at=timezone.now())
+
+
+def _uncomplete(cards, **kwargs):
+    return cards.filter(is_completed=True).update(is_completed=False, updated_at=timezone.now())
+
+
+def _assign_member(cards, actor=None, user=None, **kwargs):
+    # Cards the user is already on are left out, so the count is what gets inserted
+    rows = list(cards.exclude(card_members__user=user).values_list('id', 'board_id'))
+    CardMember.objects.bulk_create(
+        [CardMember(card_id=card_id, board_id=board_id, user=user, assigned_by=actor) for card_id, board_id in rows],
+        ignore_conflicts=True
+    )
+    return len(rows)
+
+
+def _remove_member(cards, user=None, **kwargs):
+    deleted, _ = CardMember.objects.filter(card__in=cards, user=user).delete()
+    return deleted
+
+
+def _add_label(cards, label=None, **kwargs):
+    rows = list(cards.exclude(card_labels__label=label).values_list('id', 'board_id'))
+    CardLabel.objects.bulk_create(
+        [CardLabel(card_id=card_id, board_id=board_id, label=label) for card_id, board_id in rows],
+        ignore_conflicts=True
+    )
+    return len(rows)
+
+
+def _remove_label(cards, label=None, **kwargs):
+    deleted, _ = CardLabel.objects.filter(card__in=cards, label=label).delete()
+    return deleted
+
+
+def _move(cards, target_list=None, **kwargs):
+    """Append the cards to the target list, keeping their current relative order"""
+    List.objects.select_for_update().only('id').get(pk=target_list.pk)
+    card_ids = list(cards.order_by('list__position', 'position', 'id').values_list('id', flat=True))
+    if not card_ids:
+        return 0
+    Card.objects.filter(id__in=card_ids).exclude(
+        board_id=target_list.board_id
+    ).set_board(target_list.board_id)
+    first = allocate_positions(List, target_list.pk, Card.POSITION_SEQ, count=len(card_ids))
+    return Card.objects.filter(id__in=card_ids).update(
+        list=target_list,
+        position=Case(
+            *[
+                When(id=card_id, then=Value((first + offset) * Card.POSITION_GAP))
+                for offset, card_id in enumerate(card_ids)
+            ],
+            output_field=FloatField()
+        ),
+        updated_at=timezone.now()
+    )
+
+
+def _delete(cards, **kwargs):
+    deleted, per_model = cards.delete()
+    return per_model.get(Card._meta.label, 0)
+
+
+OPERATIONS = {
+    'archive': _archive,
+    'restore': _restore,
+    'complete': _complete,
+    'uncomplete': _uncomplete,
+    'assign_member': _assign_member,
+    'remove_member': _remove_member,
+    'add_label': _add_label,
+    'remove_label': _remove_label,
+    'move': _move,
+    'delete': _delete,
+}
+
+
+def apply_bulk_operation(card_ids, operation, actor, **params):
+    """Apply ``operation`` to every card in ``card_ids`` in one transaction; return the affected row count"""
+    deleting = operation == 'delete'
+    with transaction.atomic(), muted_board_changes():
+        cards = Card.objects.filter(id__in=card_ids)
+        if deleting:
+            rows = list(cards.values_list('id', 'board_id'))
+        affected = OPERATIONS[operation](cards, actor=actor, **params)
+        if affected:
+            # One change log entry per board for the whole operation
+            if not deleting:
+                rows = cards.values_list('id', 'board_id')
+            changes = defaultdict(list)
+            for card_id, board_id in rows:
+                changes[board_id].append(('card', card_id, deleting))
+            record_changes_by_board(changes)
+        return affected
@@ -0,0 +1,74 @@
+"""
+Checklist Bulk Operations
+cards/checklists.py
+
+Whole-checklist operations as single statements: adding many items is one
+``bulk_create`` (positions come from the checklist counter in one round
+trip), reordering is one ``UPDATE ... CASE`` and completing or clearing
+every item is one ``UPDATE``. Each records the card as changed on its
+board, since set-based writes skip the save signals.
+"""
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+from boards.versioning import record_board_changes
+from .models import Checklist, ChecklistItem
+
+
+def _record_card_change(checklist):
+    record_board_changes(checklist.board_id, [('card', checklist.card_id, False)])
+
+
+def add_items(checklist, titles):
+    """Append one item per title to ``checklist``, in order; return the new items"""
+    with transaction.atomic():
+        items = ChecklistItem.objects.bulk_create([
+            ChecklistItem(checklist=checklist, board_id=checklist.board_id, title=title)
+            for title in titles
+        ])
+        _record_card_change(checklist)
+    return items
+
+
+def reorder_items(checklist, item_ids):
+    """
+    Give the items of ``checklist`` positions 1..n in the order of ``item_ids``.
+    
+    ``item_ids`` must list every item of the checklist exactly once;
+    raises ValueError otherwise.
+    """
+    with transaction.atomic():
+        Checklist.objects.select_for_update().only('id').get(pk=checklist.pk)
+        items = checklist.items.all()
+        if len(set(item_ids)) != len(item_ids) or set(item_ids) != set(items.values_list('id', flat=True)):
+            raise ValueError('item_ids must list every item of the checklist exactly once')
+        
+        items.update(
+            position=Case(
+                *[When(id=item_id, then=Value(position)) for position, item_id in enumerate(item_ids, start=1)],
+                output_field=IntegerField()
+            ),
+            updated_at=timezone.now()
+        )
+        # Keep the checklist counter ahead of every position
+        Checklist.objects.filter(
+            pk=checklist.pk,
+            item_position_seq__lt=len(item_ids)
+        ).update(item_position_seq=len(item_ids))
+        _record_card_change(checklist)
+
+
+def set_items_completed(checklist, completed, user=None):
+    """Complete (by ``user``) or uncomplete every item of ``checklist``; return the count changed"""
+    now = timezone.now()
+    with transaction.atomic():
+        items = checklist.items.filter(is_completed=not completed)
+        # Same completion fields as ChecklistItem.save and the toggle action
+        if completed:
+            changed = items.update(is_completed=True, completed_at=now, completed_by=user, updated_at=now)
+        else:
+            changed = items.update(is_completed=False, completed_at=None, completed_by=None, updated_at=now)
+        if changed:
+            _record_card_change(checklist)
+    return changed
@@ -0,0 +1,206 @@
+"""
+Copy Engine
+cards/copying.py
+
+Deep-copies boards, lists and cards level by level: lists, then cards,
+checklists, items and card labels. Primary keys are generated up front so
+each level is one SELECT plus one bulk_create, whatever the size of the
+subtree. Archived lists and cards are not copied.
+"""
+
+import uuid
+from django.db import transaction
+from boards.models import Board, BoardMember, Label
+from boards.versioning import record_board_changes
+from lists.models import List
+from .models import Card, CardLabel, Checklist, ChecklistItem
+
+LIST_COPY_FIELDS = ['name', 'position', 'card_position_seq']
+CARD_COPY_FIELDS = [
+    'title', 'description', 'position', 'cover_type', 'cover_value',
+    'due_date', 'is_completed', 'checklist_position_seq'
+]
+CHECKLIST_COPY_FIELDS = ['title', 'position', 'item_position_seq']
+ITEM_COPY_FIELDS = [
+    'title', 'is_completed', 'position', 'due_date',
+    'assigned_to_id', 'completed_at', 'completed_by_id'
+]
+
+
+def _label_map(source_board_id, target_board_id):
+    """Map labels of one board onto same-named, same-coloured labels of another"""
+    if source_board_id == target_board_id:
+        return None
+    target = {
+        (name, color): label_id
+        for label_id, name, color in Label.objects.filter(
+            board_id=target_board_id
+        ).values_list('id', 'name', 'color')
+    }
+    return {
+        label_id: target[(name, color)]
+        for label_id, name, color in Label.objects.filter(
+            board_id=source_board_id
+        ).values_list('id', 'name', 'color')
+        if (name, color) in target
+    }
+
+
+def _copy_items(checklist_map, target_board_id):
+    items = [
+        ChecklistItem(
+            id=uuid.uuid4(),
+            checklist_id=checklist_map[row.pop('checklist_id')],
+            board_id=target_board_id,
+            **row
+        )
+        for row in ChecklistItem.objects.filter(
+            checklist_id__in=list(checklist_map)
+        ).values('checklist_id', *ITEM_COPY_FIELDS)
+    ]
+    ChecklistItem.objects.bulk_create(items)
+
+
+def _copy_checklists(card_map, target_board_id):
+    checklist_map = {}
+    checklists = []
+    for row in Checklist.objects.filter(card_id__in=list(card_map)).values('id', 'card_id', *CHECKLIST_COPY_FIELDS):
+        new_id = checklist_map[row.pop('id')] = uuid.uuid4()
+        checklists.append(Checklist(
+            id=new_id,
+            card_id=card_map[row.pop('card_id')],
+            board_id=target_board_id,
+            **row
+        ))
+    Checklist.objects.bulk_create(checklists)
+    _copy_items(checklist_map, target_board_id)
+
+
+def _copy_card_labels(card_map, label_map, target_board_id):
+    """Copy label links; ``label_map`` of None keeps the same labels"""
+    card_labels = []
+    for card_id, label_id in CardLabel.objects.filter(card_id__in=list(card_map)).values_list('card_id', 'label_id'):
+        if label_map is not None:
+            label_id = label_map.get(label_id)
+            if label_id is None:
+                continue
+        card_labels.append(CardLabel(
+            id=uuid.uuid4(),
+            card_id=card_map[card_id],
+            board_id=target_board_id,
+            label_id=label_id
+        ))
+    CardLabel.objects.bulk_create(card_labels)
+
+
+def _copy_cards(source_cards, list_map, target_board_id, label_map, actor, append=False):
+    """Copy cards into the lists given by ``list_map`` (old list id -> new list id)"""
+    card_map = {}
+    cards = []
+    for row in source_cards.values('id', 'list_id', *CARD_COPY_FIELDS):
+        new_id = card_map[row.pop('id')] = uuid.uuid4()
+        if append:
+            # Position 0 makes bulk_create allocate from the target list counter
+            row['position'] = 0
+        cards.append(Card(
+            id=new_id,
+            list_id=list_map[row.pop('list_id')],
+            board_id=target_board_id,
+            created_by=actor,
+            **row
+        ))
+    Card.objects.bulk_create(cards)
+    _copy_checklists(card_map, target_board_id)
+    _copy_card_labels(card_map, label_map, target_board_id)
+    return card_map
+
+
+def _copy_lists(source_lists, target_board_id, label_map, actor, append=False):
+    list_map = {}
+    lists = []
+    for row in source_lists.values('id', *LIST_COPY_FIELDS):
+        new_id = list_map[row.pop('id')] = uuid.uuid4()
+        if append:
+            row['position'] = 0
+        lists.append(List(id=new_id, board_id=target_board_id, **row))
+    List.objects.bulk_create(lists)
+    _copy_cards(
+        Card.objects.filter(list_id__in=list(list_map), is_archived=False),
+        list_map,
+        target_board_id,
+        label_map,
+        actor
+    )
+    return list_map
+
+
+def copy_card(card, target_list, actor, title=None):
+    """Copy a card with its checklists and labels to the end of ``target_list``"""
+    with transaction.atomic():
+        card_map = _copy_cards(
+            Card.objects.filter(pk=card.pk),
+            {card.list_id: target_list.pk},
+            target_list.board_id,
+            _label_map(card.board_id, target_list.board_id),
+            actor,
+            append=True
+        )
+        new_id = card_map[card.pk]
+        if title:
+            Card.objects.filter(pk=new_id).update(title=title)
+        record_board_changes(target_list.board_id, [('card', new_id, False)])
+    return Card.objects.get(pk=new_id)
+
+
+def copy_list(list_obj, target_board, actor, name=None):
+    """Copy a list with all of its cards to the end of ``target_board``"""
+    with transaction.atomic():
+        list_map = _copy_lists(
+            List.objects.filter(pk=list_obj.pk),
+            target_board.pk,
+            _label_map(list_obj.board_id, target_board.pk),
+            actor,
+            append=True
+        )
+        new_id = list_map[list_obj.pk]
+        if name:
+            List.objects.filter(pk=new_id).update(name=name)
+        record_board_changes(
+            target_board.pk,
+            [('list', new_id, False)] + [
+                ('card', card_id, False)
+                for card_id in Card.objects.filter(list_id=new_id).values_list('id', flat=True)
+            ]
+        )
+    return List.objects.get(pk=new_id)
+
+
+def copy_board(board, actor, name=None, workspace=None):
+    """Copy a board (or instantiate a template) with its labels, lists and cards"""
+    with transaction.atomic():
+        new_board = Board.objects.create(
+            workspace=workspace if workspace is not None else board.workspace,
+            name=name or board.name,
+            description=board.description,
+            background_type=board.background_type,
+            background_value=board.background_value,
+            visibility=board.visibility,
+            list_position_seq=board.list_position_seq,
+            created_by=actor
+        )
+        BoardMember.objects.create(board=new_board, user=actor, role='admin')
+        
+        label_map = {}
+        labels = []
+        for row in Label.objects.filter(board=board).values('id', 'name', 'color'):
+            new_id = label_map[row.pop('id')] = uuid.uuid4()
+            labels.append(Label(id=new_id, board=new_board, **row))
+        Label.objects.bulk_create(labels)
+        
+        _copy_lists(
+            List.objects.filter(board=board, is_archived=False),
+            new_board.pk,
+            label_map,
+            actor
+        )
+    return new_board
@@ -0,0 +1,70 @@
+"""
+Card Filters
+cards/filters.py
+
+Query parameters for ``GET /api/cards/``, combined into a single query. Label
+and member filters are ``EXISTS`` probes on the ``(label, card)`` and
+``(user, card)`` indexes, so they never join rows in or need a DISTINCT.
+"""
+
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from .models import Card, CardLabel, CardMember
+
+
+class UUIDInFilter(django_filters.BaseInFilter, django_filters.UUIDFilter):
+    """Comma-separated list of UUIDs"""
+
+
+class CardFilter(django_filters.FilterSet):
+    """
+    Filter cards by board or list, labels, members, due date, completion and title.
+    
+    ``labels`` matches cards with any of the given labels, or with all of them
+    when ``labels_match=all``. ``members`` matches cards assigned to any of the
+    given users. ``overdue`` means due in the past and not completed.
+    """
+    
+    board = django_filters.UUIDFilter(field_name='board')
+    list = django_filters.UUIDFilter(field_name='list')
+    labels = UUIDInFilter(method='filter_labels')
+    labels_match = django_filters.ChoiceFilter(
+        choices=[('any', 'any'), ('all', 'all')],
+        method='filter_nothing'
+    )
+    members = UUIDInFilter(method='filter_members')
+    due_after = django_filters.IsoDateTimeFilter(field_name='due_date', lookup_expr='gte')
+    due_before = django_filters.IsoDateTimeFilter(field_name='due_date', lookup_expr='lt')
+    no_due_date = django_filters.BooleanFilter(field_name='due_date', lookup_expr='isnull')
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+    completed = django_filters.BooleanFilter(field_name='is_completed')
+    title = django_filters.CharFilter(field_name='title', lookup_expr='istartswith')
+    
+    class Meta:
+        model = Card
+        fields = []
+    
+    def filter_nothing(self, queryset, name, value):
+        """Modifier read by another filter"""
+        return queryset
+    
+    def filter_labels(self, queryset, name, value):
+        if self.form.cleaned_data.get('labels_match') == 'all':
+            for label_id in set(value):
+                queryset = queryset.filter(
+                    Exists(CardLabel.objects.filter(label_id=label_id, card=OuterRef('pk')))
+                )
+            return queryset
+        return queryset.filter(
+            Exists(CardLabel.objects.filter(label_id__in=value, card=OuterRef('pk')))
+        )
+    
+    def filter_members(self, queryset, name, value):
+        return queryset.filter(
+            Exists(CardMember.objects.filter(user_id__in=value, card=OuterRef('pk')))
+        )
+    
+    def filter_overdue(self, queryset, name, value):
+        overdue = Q(due_date__lt=timezone.now(), is_completed=False)
+        return queryset.filter(overdue) if value else queryset.exclude(overdue)
@@ -0,0 +1,65 @@
+"""
+Backfill Board IDs
+cards/management/commands/backfill_board_ids.py
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from lists.models import List
+from cards.models import Card, CardLabel, CardMember, Checklist, ChecklistItem, Comment, Attachment
+
+
+def _board_of(model, field):
+    """Subquery reading the board of the row referenced by ``field``"""
+    return Subquery(model.objects.filter(pk=OuterRef(field)).values('board_id')[:1])
+
+
+class Command(BaseCommand):
+    help = 'Fill in the denormalized board on cards and their labels, members, checklists, items, comments and attachments'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated per transaction'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every row, not only rows without a board'
+        )
+    
+    def handle(self, *args, **options):
+        # Parents first, so children copy an up-to-date board
+        steps = [
+            (Card, _board_of(List, 'list_id')),
+            (CardLabel, _board_of(Card, 'card_id')),
+            (CardMember, _board_of(Card, 'card_id')),
+            (Checklist, _board_of(Card, 'card_id')),
+            (ChecklistItem, _board_of(Checklist, 'checklist_id')),
+            (Comment, _board_of(Card, 'card_id')),
+            (Attachment, _board_of(Card, 'card_id')),
+        ]
+        for model, board in steps:
+            updated = self.backfill(model, board, options['batch_size'], options['all'])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {updated} updated")
+        self.stdout.write(self.style.SUCCESS('Board backfill complete'))
+    
+    def backfill(self, model, board, batch_size, recompute):
+        """Update ``model`` in primary-key batches, each in its own short transaction"""
+        queryset = model.objects.order_by('pk')
+        if not recompute:
+            queryset = queryset.filter(board__isnull=True)
+        
+        updated = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return updated
+            with transaction.atomic():
+                updated += model.objects.filter(pk__in=ids).update(board_id=board)
+            last_pk = ids[-1]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 04:27
+
+from django.db import migrations, models
+from django.db.models import F
+
+POSITION_GAP = 65536.0
+
+
+def spread_positions(apps, schema_editor):
+    """Spread existing integer positions out so cards can be inserted between them"""
+    Card = apps.get_model('cards', 'Card')
+    Card.objects.update(position=F('position') * POSITION_GAP)
+
+
+def compact_positions(apps, schema_editor):
+    Card = apps.get_model('cards', 'Card')
+    Card.objects.update(position=F('position') / POSITION_GAP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='card',
+            name='position',
+            field=models.FloatField(default=0, help_text='Order position in the list (gapped rank key)'),
+        ),
+        migrations.RunPython(spread_positions, compact_positions),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+def seed_position_seqs(apps, schema_editor):
+    """Start each card and checklist counter at its current highest child position"""
+    Card = apps.get_model('cards', 'Card')
+    Checklist = apps.get_model('cards', 'Checklist')
+    ChecklistItem = apps.get_model('cards', 'ChecklistItem')
+    Card.objects.update(
+        checklist_position_seq=Coalesce(
+            Subquery(
+                Checklist.objects.filter(card=OuterRef('pk'))
+                .order_by()
+                .values('card')
+                .annotate(max_position=Max('position'))
+                .values('max_position')
+            ),
+            0
+        )
+    )
+    Checklist.objects.update(
+        item_position_seq=Coalesce(
+            Subquery(
+                ChecklistItem.objects.filter(checklist=OuterRef('pk'))
+                .order_by()
+                .values('checklist')
+                .annotate(max_position=Max('position'))
+                .values('max_position')
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0003_alter_card_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='checklist_position_seq',
+            field=models.IntegerField(default=0, editable=False, help_text='Last position handed out to a checklist on this card'),
+        ),
+        migrations.AddField(
+            model_name='checklist',
+            name='item_position_seq',
+            field=models.IntegerField(default=0, editable=False, help_text='Last position handed out to an item in this checklist'),
+        ),
+        migrations.RunPython(seed_position_seqs, migrations.RunPython.noop),
+    ]
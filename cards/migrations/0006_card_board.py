@@ -0,0 +1,79 @@
+# Generated by Django 6.0 on 2026-10-17 04:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_board_ids(apps, schema_editor):
+    """Copy each row's board from its list, card or checklist, parents first"""
+    Card = apps.get_model('cards', 'Card')
+    Checklist = apps.get_model('cards', 'Checklist')
+    ChecklistItem = apps.get_model('cards', 'ChecklistItem')
+    Comment = apps.get_model('cards', 'Comment')
+    Attachment = apps.get_model('cards', 'Attachment')
+    List = apps.get_model('lists', 'List')
+    Card.objects.update(
+        board_id=Subquery(List.objects.filter(pk=OuterRef('list_id')).values('board_id')[:1])
+    )
+    card_board = Subquery(Card.objects.filter(pk=OuterRef('card_id')).values('board_id')[:1])
+    Checklist.objects.update(board_id=card_board)
+    Comment.objects.update(board_id=card_board)
+    Attachment.objects.update(board_id=card_board)
+    ChecklistItem.objects.update(
+        board_id=Subquery(Checklist.objects.filter(pk=OuterRef('checklist_id')).values('board_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_list_position_seq'),
+        ('cards', '0005_remove_comment_comments_card_id_82252d_idx_and_more'),
+        ('lists', '0002_list_card_position_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Denormalized from list.board for membership checks', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cards', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='checklist',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='checklists', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='checklistitem',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='checklist_items', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='boards.board'),
+        ),
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['board', 'created_at'], name='attachments_board_i_9a647e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'is_archived'], name='cards_board_i_c5a95e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['board', 'is_completed'], name='checklist_i_board_i_4e20ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['board', 'created_at'], name='comments_board_i_3d2809_idx'),
+        ),
+        migrations.RunPython(backfill_board_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-17 05:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0005_board_changes'),
+        ('cards', '0006_card_board'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cardlabel',
+            name='card_labels_label_i_849880_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cardmember',
+            name='card_member_user_id_f885e0_idx',
+        ),
+        migrations.AddIndex(
+            model_name='cardlabel',
+            index=models.Index(fields=['label', 'card'], name='card_labels_label_i_922e3c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardmember',
+            index=models.Index(fields=['user', 'card'], name='card_member_user_id_55896f_idx'),
+        ),
+    ]
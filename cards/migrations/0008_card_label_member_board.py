@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 05:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_board_ids(apps, schema_editor):
+    """Copy each label and member link's board from its card"""
+    Card = apps.get_model('cards', 'Card')
+    card_board = Subquery(Card.objects.filter(pk=OuterRef('card_id')).values('board_id')[:1])
+    apps.get_model('cards', 'CardLabel').objects.update(board_id=card_board)
+    apps.get_model('cards', 'CardMember').objects.update(board_id=card_board)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0005_board_changes'),
+        ('cards', '0007_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardlabel',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='card_labels', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='cardmember',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='card_members', to='boards.board'),
+        ),
+        migrations.RunPython(backfill_board_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 05:32
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0005_board_changes'),
+        ('cards', '0008_card_label_member_board'),
+        ('lists', '0002_list_card_position_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='text_pattern_ops'), name='cards_title_upper_idx'),
+        ),
+    ]
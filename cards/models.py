@@ -4,11 +4,129 @@ cards/models.py
 """
 
 import uuid
-from django.db import models
+from collections import defaultdict
+from django.contrib.postgres.indexes import OpClass
+from django.db import models, transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, Upper
 from django.utils import timezone
 from lists.models import List
 from users.models import User
-from boards.models import Label
+from boards.models import Board, Label
+from boards.positions import PositionedQuerySet, assign_positions, exclude_counters
+from boards.scoping import MemberScopedQuerySet
+from boards.versioning import muted_board_changes, record_board_changes, record_changes_by_board
+
+
+# Comments embedded in the card detail payload
+COMMENT_PREVIEW_SIZE = 20
+
+
+def _count_for_card(queryset, card_field='card'):
+    """Correlated COUNT subquery over ``queryset`` for the outer card row"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{card_field: OuterRef('pk')})
+            .order_by()
+            .values(card_field)
+            .annotate(count=models.Count('pk'))
+            .values('count')
+        ),
+        0
+    )
+
+
+def _inherit_board(obj, parent_field):
+    """Copy ``board`` from the parent when unset or when the parent object was (re)assigned"""
+    if obj.board_id is None or obj._meta.get_field(parent_field).is_cached(obj):
+        obj.board_id = getattr(obj, parent_field).board_id
+
+
+class ScopedPositionedQuerySet(MemberScopedQuerySet, PositionedQuerySet):
+    """QuerySet for positioned, board-scoped models"""
+
+
+class CardQuerySet(ScopedPositionedQuerySet):
+    """QuerySet for Card"""
+    
+    def with_badge_counts(self):
+        """Annotate the counts shown on card badges as SQL subqueries"""
+        return self.annotate(
+            members_count=_count_for_card(CardMember.objects.all()),
+            checklists_count=_count_for_card(Checklist.objects.all()),
+            attachments_count=_count_for_card(Attachment.objects.all()),
+            comments_count=_count_for_card(Comment.objects.all()),
+            checklist_items_count=_count_for_card(
+                ChecklistItem.objects.all(),
+                card_field='checklist__card'
+            ),
+            checklist_items_completed_count=_count_for_card(
+                ChecklistItem.objects.filter(is_completed=True),
+                card_field='checklist__card'
+            ),
+        )
+    
+    def with_details(self):
+        """Prefetch every relation rendered by CardDetailSerializer"""
+        return self.prefetch_related(
+            Prefetch(
+                'card_members',
+                queryset=CardMember.objects.select_related('user', 'assigned_by')
+            ),
+            Prefetch(
+                'card_labels',
+                queryset=CardLabel.objects.select_related('label')
+            ),
+            Prefetch(
+                'checklists',
+                queryset=Checklist.objects.prefetch_related(
+                    Prefetch(
+                        'items',
+                        queryset=ChecklistItem.objects.select_related('assigned_to', 'completed_by')
+                    )
+                )
+            ),
+            Prefetch(
+                'attachments',
+                queryset=Attachment.objects.select_related('uploaded_by')
+            ),
+            # Only the newest page of comments; the rest is paged through CardViewSet.comments
+            Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('user').prefetch_related(
+                    'mentions__user'
+                ).order_by('-created_at', '-id')[:COMMENT_PREVIEW_SIZE],
+                to_attr='recent_comments'
+            ),
+        )
+    
+    def set_board(self, board_id):
+        """Point these cards and their labels, members, checklists, items, comments and attachments at ``board_id``"""
+        rows = list(self.values_list('id', 'board_id'))
+        if not rows:
+            return 0
+        card_ids = [card_id for card_id, _ in rows]
+        moved_from = defaultdict(list)
+        for card_id, previous_board_id in rows:
+            if previous_board_id != board_id:
+                moved_from[previous_board_id].append(card_id)
+        
+        CardLabel.objects.filter(card_id__in=card_ids).update(board_id=board_id)
+        CardMember.objects.filter(card_id__in=card_ids).update(board_id=board_id)
+        Checklist.objects.filter(card_id__in=card_ids).update(board_id=board_id)
+        ChecklistItem.objects.filter(checklist__card_id__in=card_ids).update(board_id=board_id)
+        Comment.objects.filter(card_id__in=card_ids).update(board_id=board_id)
+        Attachment.objects.filter(card_id__in=card_ids).update(board_id=board_id)
+        updated = Card.objects.filter(id__in=card_ids).update(board_id=board_id)
+        
+        # Moved cards disappear from their old boards and appear on the new one
+        changes = {
+            previous_board_id: [('card', card_id, True) for card_id in moved]
+            for previous_board_id, moved in moved_from.items()
+        }
+        changes[board_id] = [('card', card_id, False) for card_id in card_ids]
+        record_changes_by_board(changes)
+        return updated
 
 
 class Card(models.Model):
@@ -19,15 +137,29 @@ class Card(models.Model):
         ('image', 'Image'),
     ]
     
+    # Spacing between consecutive positions, leaving room to insert between neighbours
+    POSITION_GAP = 65536.0
+    POSITION_PARENT = 'list'
+    POSITION_SEQ = 'card_position_seq'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     list = models.ForeignKey(
         List,
         on_delete=models.CASCADE,
         related_name='cards'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='cards',
+        help_text="Denormalized from list.board for membership checks"
+    )
     title = models.CharField(max_length=500)
     description = models.TextField(blank=True)
-    position = models.IntegerField(default=0, help_text="Order position in the list")
+    position = models.FloatField(default=0, help_text="Order position in the list (gapped rank key)")
     
     cover_type = models.CharField(
         max_length=50,
@@ -41,6 +173,12 @@ class Card(models.Model):
     is_completed = models.BooleanField(default=False)
     is_archived = models.BooleanField(default=False)
     
+    checklist_position_seq = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Last position handed out to a checklist on this card"
+    )
+    
     created_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -63,6 +201,8 @@ class Card(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     archived_at = models.DateTimeField(blank=True, null=True)
     
+    objects = CardQuerySet.as_manager()
+    
     class Meta:
         db_table = 'cards'
         verbose_name = 'Card'
@@ -71,8 +211,11 @@ class Card(models.Model):
         indexes = [
             models.Index(fields=['list']),
             models.Index(fields=['list', 'position']),
+            models.Index(fields=['board', 'is_archived']),
             models.Index(fields=['created_by']),
             models.Index(fields=['due_date']),
+            # Serves title__istartswith, which compares UPPER(title) with LIKE 'PREFIX%'
+            models.Index(OpClass(Upper('title'), name='text_pattern_ops'), name='cards_title_upper_idx'),
         ]
     
     def __str__(self):
@@ -91,14 +234,29 @@ class Card(models.Model):
         self.save()
     
     def save(self, *args, **kwargs):
-        """Auto-assign position if not provided"""
-        if self.position == 0 and not self.pk:
-            # Get the highest position in this list
-            max_position = Card.objects.filter(
-                list=self.list
-            ).aggregate(models.Max('position'))['position__max']
-            self.position = (max_position or 0) + 1
-        super().save(*args, **kwargs)
+        """Auto-assign position and board if not provided"""
+        assign_positions(Card, [self])
+        previous_board_id = self.board_id
+        _inherit_board(self, 'list')
+        exclude_counters(self, kwargs, 'checklist_position_seq')
+        if self._state.adding or previous_board_id is None or previous_board_id == self.board_id:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            # Rows first, then both boards' change logs (see boards.versioning for the lock order);
+            # labels, members, checklists, items, comments and attachments follow the card
+            Card.objects.filter(pk=self.pk).set_board(self.board_id)
+            with muted_board_changes():
+                super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        """Delete the card and its details, logging one board change for all of it"""
+        board_id, card_id = self.board_id, self.pk
+        with transaction.atomic():
+            with muted_board_changes():
+                deleted = super().delete(*args, **kwargs)
+            record_board_changes(board_id, [('card', card_id, True)])
+        return deleted
 
 
 class CardMember(models.Model):
@@ -110,6 +268,14 @@ class CardMember(models.Model):
         on_delete=models.CASCADE,
         related_name='card_members'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='card_members'
+    )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -131,11 +297,16 @@ class CardMember(models.Model):
         ordering = ['assigned_at']
         indexes = [
             models.Index(fields=['card']),
-            models.Index(fields=['user']),
+            models.Index(fields=['user', 'card']),
         ]
     
     def __str__(self):
         return f"{self.user.username} assigned to {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        """Auto-assign board if not provided"""
+        _inherit_board(self, 'card')
+        super().save(*args, **kwargs)
 
 
 class CardLabel(models.Model):
@@ -147,6 +318,14 @@ class CardLabel(models.Model):
         on_delete=models.CASCADE,
         related_name='card_labels'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='card_labels'
+    )
     label = models.ForeignKey(
         Label,
         on_delete=models.CASCADE,
@@ -162,28 +341,52 @@ class CardLabel(models.Model):
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['card']),
-            models.Index(fields=['label']),
+            models.Index(fields=['label', 'card']),
         ]
     
     def __str__(self):
         return f"{self.label.name} on {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        """Auto-assign board if not provided"""
+        _inherit_board(self, 'card')
+        super().save(*args, **kwargs)
 
 
 class Checklist(models.Model):
     """Checklist model"""
     
+    POSITION_PARENT = 'card'
+    POSITION_SEQ = 'checklist_position_seq'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     card = models.ForeignKey(
         Card,
         on_delete=models.CASCADE,
         related_name='checklists'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='checklists'
+    )
     title = models.CharField(max_length=255)
     position = models.IntegerField(default=0)
     
+    item_position_seq = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Last position handed out to an item in this checklist"
+    )
+    
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ScopedPositionedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'checklists'
         verbose_name = 'Checklist'
@@ -197,24 +400,36 @@ class Checklist(models.Model):
         return f"{self.title} - {self.card.title}"
     
     def save(self, *args, **kwargs):
-        """Auto-assign position if not provided"""
-        if self.position == 0 and not self.pk:
-            max_position = Checklist.objects.filter(
-                card=self.card
-            ).aggregate(models.Max('position'))['position__max']
-            self.position = (max_position or 0) + 1
+        """Auto-assign position and board if not provided"""
+        assign_positions(Checklist, [self])
+        previous_board_id = self.board_id
+        _inherit_board(self, 'card')
+        exclude_counters(self, kwargs, 'item_position_seq')
         super().save(*args, **kwargs)
+        if previous_board_id is not None and previous_board_id != self.board_id:
+            self.items.update(board_id=self.board_id)
 
 
 class ChecklistItem(models.Model):
     """Checklist item model"""
     
+    POSITION_PARENT = 'checklist'
+    POSITION_SEQ = 'item_position_seq'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     checklist = models.ForeignKey(
         Checklist,
         on_delete=models.CASCADE,
         related_name='items'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='checklist_items'
+    )
     title = models.CharField(max_length=500)
     is_completed = models.BooleanField(default=False)
     position = models.IntegerField(default=0)
@@ -240,6 +455,8 @@ class ChecklistItem(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ScopedPositionedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'checklist_items'
         verbose_name = 'Checklist Item'
@@ -247,18 +464,16 @@ class ChecklistItem(models.Model):
         ordering = ['position']
         indexes = [
             models.Index(fields=['checklist']),
+            models.Index(fields=['board', 'is_completed']),
         ]
     
     def __str__(self):
         return self.title
     
     def save(self, *args, **kwargs):
-        """Auto-assign position and handle completion"""
-        if self.position == 0 and not self.pk:
-            max_position = ChecklistItem.objects.filter(
-                checklist=self.checklist
-            ).aggregate(models.Max('position'))['position__max']
-            self.position = (max_position or 0) + 1
+        """Auto-assign position and board, and handle completion"""
+        assign_positions(ChecklistItem, [self])
+        _inherit_board(self, 'checklist')
         
         # Set completed_at when marking as completed
         if self.is_completed and not self.completed_at:
@@ -279,6 +494,14 @@ class Attachment(models.Model):
         on_delete=models.CASCADE,
         related_name='attachments'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='attachments'
+    )
     file_name = models.CharField(max_length=255)
     file_url = models.URLField(max_length=1000)
     file_type = models.CharField(max_length=100, blank=True, help_text="MIME type")
@@ -294,6 +517,8 @@ class Attachment(models.Model):
     
     created_at = models.DateTimeField(default=timezone.now)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'attachments'
         verbose_name = 'Attachment'
@@ -301,10 +526,16 @@ class Attachment(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['card']),
+            models.Index(fields=['board', 'created_at']),
         ]
     
     def __str__(self):
         return f"{self.file_name} - {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        """Auto-assign board if not provided"""
+        _inherit_board(self, 'card')
+        super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -316,6 +547,14 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    board = models.ForeignKey(
+        Board,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='comments'
+    )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -327,18 +566,27 @@ class Comment(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'comments'
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
         ordering = ['created_at']
         indexes = [
-            models.Index(fields=['card']),
+            # Serves keyset pagination in both directions
+            models.Index(fields=['card', 'created_at', 'id']),
+            models.Index(fields=['board', 'created_at']),
             models.Index(fields=['user']),
         ]
     
     def __str__(self):
         return f"{self.user.username} on {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        """Auto-assign board if not provided"""
+        _inherit_board(self, 'card')
+        super().save(*args, **kwargs)
 
 
 class CommentMention(models.Model):
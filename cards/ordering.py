@@ -0,0 +1,203 @@
+"""
+Card Ordering
+cards/ordering.py
+
+Cards are ordered by a gapped float rank (``Card.position``). Moving a card
+between two neighbours gives it the midpoint of their positions, so a move
+writes exactly one row. Only when two neighbours get too close together is
+the whole list respaced.
+
+Whole-list operations (respacing, sorting, moving every card to another
+list) rank the cards with ``ROW_NUMBER()`` and rewrite them in one
+``UPDATE ... FROM``, whatever the length of the list.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+from boards.positions import allocate_positions
+from boards.versioning import record_board_changes
+from lists.models import List
+from .models import Card
+
+# Neighbours closer than this are respaced before inserting between them
+MIN_POSITION_GAP = 1e-6
+
+# ORDER BY clauses for sort_list; ties keep the current order
+SORT_ORDERS = {
+    'position': 'position, created_at, id',
+    'due_date': 'due_date ASC NULLS LAST, position, id',
+    'created_at': 'created_at, id',
+    'title': 'LOWER(title), position, id',
+}
+
+
+def position_between(before, after):
+    """Return a position strictly between two neighbour positions (either may be None)"""
+    if before is None and after is None:
+        return Card.POSITION_GAP
+    if after is None:
+        return before + Card.POSITION_GAP
+    if before is None:
+        return after / 2 if after > 0 else after - Card.POSITION_GAP
+    return (before + after) / 2
+
+
+def _needs_respace(before, after):
+    return before is not None and after is not None and after - before < MIN_POSITION_GAP
+
+
+def respace_list(list_id, order='position'):
+    """
+    Rewrite the positions of every card in a list with a full gap between them.
+    
+    ``order`` is a key of ``SORT_ORDERS``. Returns the ids of the rewritten
+    cards; recording them as board changes is left to the caller.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE cards SET position = ranked.ordinal * %s
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY {SORT_ORDERS[order]}) AS ordinal
+                FROM cards
+                WHERE list_id = %s
+            ) AS ranked
+            WHERE cards.id = ranked.id
+            RETURNING cards.id
+            """,
+            [Card.POSITION_GAP, list_id]
+        )
+        respaced = [row[0] for row in cursor.fetchall()]
+    # Keep the list counter ahead of every respaced position
+    List.objects.filter(
+        pk=list_id,
+        card_position_seq__lt=len(respaced)
+    ).update(card_position_seq=len(respaced))
+    return respaced
+
+
+def renumber_list(list_id, board_id):
+    """
+    Respace a list's cards under the list lock and wind its counter back to match.
+    
+    Returns the number of cards respaced.
+    """
+    with transaction.atomic():
+        List.objects.select_for_update().only('id').get(pk=list_id)
+        respaced = respace_list(list_id)
+        List.objects.filter(pk=list_id).update(card_position_seq=len(respaced))
+        record_board_changes(board_id, [('card', card_id, False) for card_id in respaced])
+    return len(respaced)
+
+
+def sort_list(list_obj, order):
+    """Reorder every card in ``list_obj`` by ``order`` (a key of ``SORT_ORDERS``); return the count"""
+    with transaction.atomic():
+        List.objects.select_for_update().only('id').get(pk=list_obj.pk)
+        sorted_ids = respace_list(list_obj.pk, order)
+        record_board_changes(list_obj.board_id, [('card', card_id, False) for card_id in sorted_ids])
+    return len(sorted_ids)
+
+
+def move_list_cards(source_list, target_list):
+    """Append every open card of ``source_list`` to ``target_list`` in their current order; return the count"""
+    if source_list.pk == target_list.pk:
+        return 0
+    with transaction.atomic():
+        # Lock both lists in a fixed order so opposite moves cannot deadlock
+        list(List.objects.select_for_update().filter(
+            pk__in=[source_list.pk, target_list.pk]
+        ).order_by('pk').values_list('id', flat=True))
+        cards = Card.objects.filter(list=source_list, is_archived=False)
+        count = cards.count()
+        if not count:
+            return 0
+        
+        if source_list.board_id != target_list.board_id:
+            cards.set_board(target_list.board_id)
+        first = allocate_positions(List, target_list.pk, Card.POSITION_SEQ, count=count)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE cards SET list_id = %s, position = (%s + ranked.ordinal - 1) * %s, updated_at = %s
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (ORDER BY position, created_at, id) AS ordinal
+                    FROM cards
+                    WHERE list_id = %s AND NOT is_archived
+                ) AS ranked
+                WHERE cards.id = ranked.id
+                RETURNING cards.id
+                """,
+                [target_list.pk, first, Card.POSITION_GAP, timezone.now(), source_list.pk]
+            )
+            moved = [row[0] for row in cursor.fetchall()]
+        record_board_changes(target_list.board_id, [('card', card_id, False) for card_id in moved])
+    return len(moved)
+
+
+def _neighbour_positions(siblings, after_card_id=None, before_card_id=None, index=None):
+    """Resolve the positions of the cards the moved card lands between"""
+    requested = [card_id for card_id in (after_card_id, before_card_id) if card_id]
+    positions = dict(siblings.filter(id__in=requested).values_list('id', 'position'))
+    if len(positions) != len(requested):
+        raise ValueError('Neighbour cards must belong to the target list')
+    
+    ordered = siblings.order_by('position', 'id').values_list('position', flat=True)
+    
+    if after_card_id and before_card_id:
+        before, after = positions[after_card_id], positions[before_card_id]
+        if before > after:
+            raise ValueError('after_card_id must be ordered before before_card_id')
+        return before, after
+    if after_card_id:
+        before = positions[after_card_id]
+        return before, ordered.filter(position__gt=before).first()
+    if before_card_id:
+        after = positions[before_card_id]
+        return ordered.filter(position__lt=after).last(), after
+    
+    if index is not None:
+        if index == 0:
+            return None, ordered.first()
+        pair = list(ordered[index - 1:index + 1])
+        if len(pair) == 2:
+            return pair[0], pair[1]
+        if len(pair) == 1:
+            return pair[0], None
+    return ordered.last(), None
+
+
+def move_card(card, target_list, after_card_id=None, before_card_id=None, index=None):
+    """
+    Move ``card`` into ``target_list`` between two neighbours.
+    
+    The neighbours are given either by card id (``after_card_id`` is the card
+    the moved card follows, ``before_card_id`` the card it precedes) or by a
+    0-based ``index`` within the target list. With neither, the card is
+    appended. Moving to a list on another board carries the card's
+    checklists, items, comments and attachments along. Runs in one
+    transaction under a row lock on the target list; the board is locked
+    last, when the move is recorded.
+    """
+    with transaction.atomic():
+        List.objects.select_for_update().only('id').get(pk=target_list.pk)
+        # Archived cards keep their positions but are not neighbours anyone can see
+        siblings = Card.objects.filter(list=target_list, is_archived=False).exclude(pk=card.pk)
+        
+        before, after = _neighbour_positions(siblings, after_card_id, before_card_id, index)
+        respaced = []
+        if _needs_respace(before, after):
+            respaced = respace_list(target_list.pk)
+            before, after = _neighbour_positions(siblings, after_card_id, before_card_id, index)
+        
+        card.list = target_list
+        card.position = position_between(before, after)
+        if after is None:
+            # Appends draw from the list counter so later creates still land after this card
+            seq = allocate_positions(List, target_list.pk, Card.POSITION_SEQ)
+            card.position = max(card.position, seq * Card.POSITION_GAP)
+        card.save(update_fields=['list', 'board', 'position', 'updated_at'])
+        if respaced:
+            # Logged after the card is written: the board row is always locked last
+            record_board_changes(target_list.board_id, [('card', card_id, False) for card_id in respaced])
+    return card
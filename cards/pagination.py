@@ -0,0 +1,102 @@
+"""
+Card Pagination
+cards/pagination.py
+"""
+
+import base64
+from datetime import datetime
+from uuid import UUID
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CommentCursorPagination(BasePagination):
+    """
+    Keyset pagination for comments on ``(created_at, id)``.
+    
+    Pages are read straight off the ``(card, created_at, id)`` index, scanned
+    backwards for ``?ordering=newest`` (the default) and forwards for
+    ``?ordering=oldest``, so fetching any page costs the same however long
+    the thread is.
+    """
+    
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+    
+    def encode_cursor(self, comment):
+        raw = f"{comment.created_at.isoformat()}|{comment.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    def decode_cursor(self, cursor):
+        try:
+            created_at, comment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), UUID(comment_id)
+        except (ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.newest_first = request.query_params.get(self.ordering_query_param) != 'oldest'
+        page_size = self.get_page_size(request)
+        
+        if self.newest_first:
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            queryset = queryset.order_by('created_at', 'id')
+        
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, comment_id = self.decode_cursor(cursor)
+            # The redundant bound on created_at keeps this an index range scan
+            if self.newest_first:
+                queryset = queryset.filter(created_at__lte=created_at).filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=comment_id)
+                )
+            else:
+                queryset = queryset.filter(created_at__gte=created_at).filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=comment_id)
+                )
+        
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+    
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data
+        })
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -3,13 +3,16 @@ Card Serializers
 cards/serializers.py
 """
 
+import re
 from rest_framework import serializers
 from .models import (
     Card, CardMember, CardLabel, Checklist, ChecklistItem,
-    Attachment, Comment, CommentMention
+    Attachment, Comment, CommentMention, COMMENT_PREVIEW_SIZE
 )
+from users.models import User
 from users.serializers import UserSerializer
 from boards.serializers import LabelSerializer
+from notifications.models import Notification
 
 
 class ChecklistItemSerializer(serializers.ModelSerializer):
@@ -44,11 +47,12 @@ class ChecklistSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_progress(self, obj):
-        """Calculate checklist progress"""
-        total = obj.items.count()
+        """Calculate checklist progress from the (prefetched) items"""
+        items = obj.items.all()
+        total = len(items)
         if total == 0:
             return 0
-        completed = obj.items.filter(is_completed=True).count()
+        completed = sum(1 for item in items if item.is_completed)
         return round((completed / total) * 100, 2)
 
 
@@ -70,8 +74,11 @@ class AttachmentSerializer(serializers.ModelSerializer):
 class CommentSerializer(serializers.ModelSerializer):
     """Serializer for Comment"""
     
+    # @username tokens; a trailing dot is treated as punctuation
+    MENTION_PATTERN = re.compile(r'(?<![\w@])@([\w.+-]+)')
+    
     user_details = UserSerializer(source='user', read_only=True)
-    mentioned_users = UserSerializer(many=True, read_only=True, source='mentions')
+    mentioned_users = serializers.SerializerMethodField()
     
     class Meta:
         model = Comment
@@ -81,14 +88,76 @@ class CommentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'is_edited', 'created_at', 'updated_at']
     
+    def get_mentioned_users(self, obj):
+        if 'mentions' in getattr(obj, '_prefetched_objects_cache', {}):
+            mentions = obj.mentions.all()
+        else:
+            mentions = obj.mentions.select_related('user')
+        return UserSerializer([mention.user for mention in mentions], many=True).data
+    
     def create(self, validated_data):
         """Create comment and handle mentions"""
         request = self.context.get('request')
-        comment = Comment.objects.create(
-            user=request.user,
-            **validated_data
-        )
+        validated_data.setdefault('user', request.user)
+        comment = Comment.objects.create(**validated_data)
+        self.sync_mentions(comment, created=True)
+        return comment
+    
+    def update(self, instance, validated_data):
+        """Update comment and add/remove mentions that changed"""
+        comment = super().update(instance, validated_data)
+        if 'content' in validated_data:
+            self.sync_mentions(comment)
         return comment
+    
+    def sync_mentions(self, comment, created=False):
+        """
+        Match CommentMention rows to the @usernames in the comment.
+        
+        Handles are resolved against the board's members in one query;
+        only added mentions are inserted and notified, each with a single
+        bulk_create, and removed ones are deleted in one statement.
+        """
+        handles = set()
+        for handle in self.MENTION_PATTERN.findall(comment.content):
+            handles.update({handle, handle.rstrip('.')})
+        
+        mentioned = set()
+        if handles:
+            mentioned = set(
+                User.objects.filter(
+                    username__in=handles,
+                    board_memberships__board=comment.board_id
+                ).exclude(
+                    pk=comment.user_id
+                ).values_list('id', flat=True)
+            )
+        
+        existing = set() if created else set(comment.mentions.values_list('user_id', flat=True))
+        added = mentioned - existing
+        removed = existing - mentioned
+        
+        if removed:
+            CommentMention.objects.filter(comment=comment, user_id__in=removed).delete()
+        if not added:
+            return
+        
+        CommentMention.objects.bulk_create([
+            CommentMention(comment=comment, user_id=user_id) for user_id in added
+        ])
+        author = comment.user
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                type='mention',
+                title=f"{author.username} mentioned you in a comment",
+                message=comment.content[:500],
+                related_board_id=comment.board_id,
+                related_card_id=comment.card_id,
+                related_user=author
+            )
+            for user_id in added
+        ])
 
 
 class CardMemberSerializer(serializers.ModelSerializer):
@@ -116,13 +185,20 @@ class CardLabelSerializer(serializers.ModelSerializer):
 
 
 class CardSerializer(serializers.ModelSerializer):
-    """Serializer for Card model"""
+    """Serializer for Card model
+    
+    Badge counts are read from the annotations added by
+    ``Card.objects.with_badge_counts()`` and only fall back to a COUNT
+    query when the card was loaded without them.
+    """
     
     created_by_user = UserSerializer(source='created_by', read_only=True)
     members_count = serializers.SerializerMethodField()
     checklists_count = serializers.SerializerMethodField()
     attachments_count = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
+    checklist_items_count = serializers.SerializerMethodField()
+    checklist_items_completed_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Card
@@ -131,40 +207,151 @@ class CardSerializer(serializers.ModelSerializer):
             'cover_type', 'cover_value', 'due_date', 'is_completed', 'is_archived',
             'created_by', 'created_by_user', 'members_count', 'checklists_count',
             'attachments_count', 'comments_count',
+            'checklist_items_count', 'checklist_items_completed_count',
             'created_at', 'updated_at', 'archived_at'
         ]
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at', 'archived_at']
     
     def get_members_count(self, obj):
+        if hasattr(obj, 'members_count'):
+            return obj.members_count
         return obj.card_members.count()
     
     def get_checklists_count(self, obj):
+        if hasattr(obj, 'checklists_count'):
+            return obj.checklists_count
         return obj.checklists.count()
     
     def get_attachments_count(self, obj):
+        if hasattr(obj, 'attachments_count'):
+            return obj.attachments_count
         return obj.attachments.count()
     
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
+    
+    def get_checklist_items_count(self, obj):
+        if hasattr(obj, 'checklist_items_count'):
+            return obj.checklist_items_count
+        return ChecklistItem.objects.filter(checklist__card=obj).count()
+    
+    def get_checklist_items_completed_count(self, obj):
+        if hasattr(obj, 'checklist_items_completed_count'):
+            return obj.checklist_items_completed_count
+        return ChecklistItem.objects.filter(checklist__card=obj, is_completed=True).count()
 
 
 class CardDetailSerializer(CardSerializer):
-    """Detailed serializer for Card with all relationships"""
+    """Detailed serializer for Card with all relationships
+    
+    ``comments`` holds only the newest page (see ``Card.objects.with_details``);
+    older comments are fetched through the cursor-paginated comments action.
+    """
     
     card_members = CardMemberSerializer(many=True, read_only=True)
     card_labels = CardLabelSerializer(many=True, read_only=True)
     checklists = ChecklistSerializer(many=True, read_only=True)
     attachments = AttachmentSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     
     class Meta(CardSerializer.Meta):
         fields = CardSerializer.Meta.fields + [
             'card_members', 'card_labels', 'checklists', 'attachments', 'comments'
         ]
+    
+    def get_comments(self, obj):
+        comments = getattr(obj, 'recent_comments', None)
+        if comments is None:
+            comments = obj.comments.select_related('user').order_by(
+                '-created_at', '-id'
+            )[:COMMENT_PREVIEW_SIZE]
+        return CommentSerializer(comments, many=True, context=self.context).data
 
 
 class MoveCardSerializer(serializers.Serializer):
     """Serializer for moving cards"""
     
     list_id = serializers.UUIDField(required=True)
-    position = serializers.IntegerField(min_value=0, required=True)
\ No newline at end of file
+    after_card_id = serializers.UUIDField(
+        required=False,
+        help_text="Card the moved card is placed directly after"
+    )
+    before_card_id = serializers.UUIDField(
+        required=False,
+        help_text="Card the moved card is placed directly before"
+    )
+    position = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        help_text="0-based index in the target list, used when no neighbour ids are given"
+    )
+
+
+class CopyCardSerializer(serializers.Serializer):
+    """Serializer for copying a card"""
+    
+    list_id = serializers.UUIDField(
+        required=False,
+        help_text="List to copy the card into (defaults to the card's own list)"
+    )
+    title = serializers.CharField(max_length=500, required=False)
+
+
+class BulkCardActionSerializer(serializers.Serializer):
+    """Serializer for applying one operation to many cards"""
+    
+    # Parameter each operation requires, if any
+    OPERATION_PARAMS = {
+        'archive': None,
+        'restore': None,
+        'complete': None,
+        'uncomplete': None,
+        'assign_member': 'user_id',
+        'remove_member': 'user_id',
+        'add_label': 'label_id',
+        'remove_label': 'label_id',
+        'move': 'list_id',
+        'delete': None,
+    }
+    
+    card_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=1000
+    )
+    operation = serializers.ChoiceField(choices=list(OPERATION_PARAMS))
+    user_id = serializers.UUIDField(required=False)
+    label_id = serializers.UUIDField(required=False)
+    list_id = serializers.UUIDField(required=False)
+    
+    def validate(self, attrs):
+        """Validate the operation's parameter is present"""
+        param = self.OPERATION_PARAMS[attrs['operation']]
+        if param and not attrs.get(param):
+            raise serializers.ValidationError({
+                param: f"This field is required for the '{attrs['operation']}' operation."
+            })
+        attrs['card_ids'] = list(dict.fromkeys(attrs['card_ids']))
+        return attrs
+
+
+class AddChecklistItemsSerializer(serializers.Serializer):
+    """Serializer for adding many checklist items at once"""
+    
+    titles = serializers.ListField(
+        child=serializers.CharField(max_length=500),
+        allow_empty=False,
+        max_length=200
+    )
+
+
+class ReorderChecklistItemsSerializer(serializers.Serializer):
+    """Serializer for reordering checklist items"""
+    
+    item_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=1000
+    )
@@ -1,3 +1,680 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from notifications.models import Notification
+from boards.models import Board, BoardChange, BoardMember, Label
+from lists.models import List
+from .copying import copy_board, copy_card, copy_list
+from .models import COMMENT_PREVIEW_SIZE, Attachment, Card, CardLabel, CardMember, Checklist, ChecklistItem, Comment, CommentMention
+from .ordering import MIN_POSITION_GAP
 
-# Create your tests here.
+
+class CardBadgeCountTests(TestCase):
+    """Badge counts on GET /api/cards/ come from annotations, not per-card queries"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.other = User.objects.create_user('member@example.com', 'member', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#f00')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_cards(self, count):
+        for i in range(count):
+            card = Card.objects.create(list=self.list, title=f'Card {i}', created_by=self.user)
+            CardLabel.objects.create(card=card, label=self.label)
+            for user in [self.user, self.other][:i % 3]:
+                CardMember.objects.create(card=card, user=user)
+            checklist = Checklist.objects.create(card=card, title='Steps')
+            for j in range(i % 4):
+                ChecklistItem.objects.create(checklist=checklist, title=f'Step {j}', is_completed=j % 2 == 0)
+            for j in range(i % 3):
+                Comment.objects.create(card=card, user=self.user, content=f'Comment {j}')
+            for j in range(i % 2):
+                Attachment.objects.create(card=card, file_name='spec.pdf', file_url='https://example.com/spec.pdf')
+    
+    def list_cards(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/cards/', {'list': str(self.list.id)})
+        return response.json()['results'], len(queries)
+    
+    def test_query_count_does_not_grow_with_cards(self):
+        self.add_cards(2)
+        rows, small = self.list_cards()
+        self.assertEqual(len(rows), 2)
+        
+        Card.objects.all().delete()
+        self.add_cards(10)
+        rows, large = self.list_cards()
+        
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(large, small)
+    
+    def test_counts_match_the_rows(self):
+        self.add_cards(6)
+        rows, _ = self.list_cards()
+        
+        for row in rows:
+            card = Card.objects.get(pk=row['id'])
+            items = ChecklistItem.objects.filter(checklist__card=card)
+            self.assertEqual(
+                {key: value for key, value in row.items() if key.endswith('_count')},
+                {
+                    'members_count': card.card_members.count(),
+                    'checklists_count': card.checklists.count(),
+                    'attachments_count': card.attachments.count(),
+                    'comments_count': card.comments.count(),
+                    'checklist_items_count': items.count(),
+                    'checklist_items_completed_count': items.filter(is_completed=True).count(),
+                },
+                row['title']
+            )
+
+
+class CardDetailTests(TestCase):
+    """Tests for GET /api/cards/{id}/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.card = Card.objects.create(list=self.list, title='Ship it', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_details(self, count):
+        first = self.card.card_members.count()
+        for i in range(first, first + count):
+            user = User.objects.create_user(f'member{i}@example.com', f'member{i}', 'password123!')
+            CardMember.objects.create(card=self.card, user=user, assigned_by=self.user)
+            CardLabel.objects.create(card=self.card, label=Label.objects.create(board=self.board, name=f'Label {i}', color='#f00'))
+            checklist = Checklist.objects.create(card=self.card, title=f'Checklist {i}')
+            ChecklistItem.objects.create(checklist=checklist, title='Step', assigned_to=user, completed_by=user, is_completed=True)
+            Attachment.objects.create(card=self.card, file_name='spec.pdf', file_url='https://example.com/spec.pdf', uploaded_by=user)
+            Comment.objects.create(card=self.card, user=user, content=f'Comment {i}')
+    
+    def retrieve(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/cards/{self.card.id}/')
+        return response.json(), len(queries)
+    
+    def test_query_count_does_not_grow_with_details(self):
+        self.add_details(1)
+        _, small = self.retrieve()
+        self.add_details(5)
+        
+        card, large = self.retrieve()
+        
+        self.assertEqual(large, small)
+        self.assertEqual(len(card['card_members']), 6)
+        self.assertEqual(len(card['checklists']), 6)
+        self.assertEqual(len(card['comments']), 6)
+    
+    def test_embeds_only_the_newest_comments(self):
+        start = timezone.now()
+        comments = [
+            Comment.objects.create(card=self.card, user=self.user, content=f'Comment {i}', created_at=start + timedelta(minutes=i))
+            for i in range(COMMENT_PREVIEW_SIZE + 5)
+        ]
+        
+        card, _ = self.retrieve()
+        
+        self.assertEqual(
+            [comment['id'] for comment in card['comments']],
+            [str(comment.id) for comment in reversed(comments[-COMMENT_PREVIEW_SIZE:])]
+        )
+        self.assertEqual(card['comments_count'], COMMENT_PREVIEW_SIZE + 5)
+
+
+class CommentPaginationTests(TestCase):
+    """Tests for GET /api/cards/{id}/comments/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.card = Card.objects.create(list=self.list, title='Ship it', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        start = timezone.now()
+        # Three comments share a timestamp, so pages must break ties on id
+        self.comments = sorted(
+            (
+                Comment.objects.create(
+                    card=self.card,
+                    user=self.user,
+                    content=f'Comment {i}',
+                    created_at=start + timedelta(seconds=offset)
+                )
+                for i, offset in enumerate([0, 1, 1, 1, 2])
+            ),
+            key=lambda comment: (comment.created_at, comment.id)
+        )
+    
+    def url(self):
+        return f'/api/cards/{self.card.id}/comments/'
+    
+    def read_all(self, **params):
+        ids, cursor = [], None
+        while True:
+            response = self.client.get(self.url(), {'page_size': 2, **params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 2)
+            ids += [comment['id'] for comment in page['results']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+    
+    def test_pages_newest_first(self):
+        self.assertEqual(self.read_all(), [str(comment.id) for comment in reversed(self.comments)])
+    
+    def test_pages_oldest_first(self):
+        self.assertEqual(self.read_all(ordering='oldest'), [str(comment.id) for comment in self.comments])
+    
+    def test_malformed_cursor_is_not_found(self):
+        for cursor in ['%%%', 'bm90LWEtY3Vyc29y', 'YWJjfGRlZg==', '////']:
+            response = self.client.get(self.url(), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class CardMoveTests(TestCase):
+    """Tests for PATCH /api/cards/{id}/move/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.todo = List.objects.create(board=self.board, name='Todo')
+        self.done = List.objects.create(board=self.board, name='Done')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_cards(self, lst, *titles, **fields):
+        return [Card.objects.create(list=lst, title=title, created_by=self.user, **fields) for title in titles]
+    
+    def move(self, card, lst, **data):
+        return self.client.patch(f'/api/cards/{card.id}/move/', {'list_id': str(lst.id), **data}, format='json')
+    
+    def titles(self, lst):
+        return list(Card.objects.filter(list=lst, is_archived=False).order_by('position', 'id').values_list('title', flat=True))
+    
+    def test_move_after_and_before(self):
+        a, b, c = self.add_cards(self.todo, 'A', 'B', 'C')
+        
+        response = self.move(c, self.todo, after_card_id=str(a.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(self.todo), ['A', 'C', 'B'])
+        
+        self.move(a, self.todo, before_card_id=str(b.id))
+        self.assertEqual(self.titles(self.todo), ['C', 'A', 'B'])
+        
+        # Only the moved card is written
+        self.assertEqual(Card.objects.get(pk=b.pk).position, b.position)
+    
+    def test_move_to_index_in_another_list(self):
+        self.add_cards(self.done, 'X', 'Y')
+        card, = self.add_cards(self.todo, 'A')
+        
+        self.move(card, self.done, position=1)
+        self.assertEqual(self.titles(self.done), ['X', 'A', 'Y'])
+        
+        self.move(card, self.done, position=0)
+        self.assertEqual(self.titles(self.done), ['A', 'X', 'Y'])
+        
+        self.move(card, self.done)
+        self.assertEqual(self.titles(self.done), ['X', 'Y', 'A'])
+        self.assertEqual(self.titles(self.todo), [])
+    
+    def test_archived_cards_are_not_neighbours(self):
+        self.add_cards(self.done, 'Old 1', 'Old 2', is_archived=True)
+        self.add_cards(self.done, 'X', 'Y')
+        card, = self.add_cards(self.todo, 'A')
+        
+        self.move(card, self.done, position=1)
+        
+        self.assertEqual(self.titles(self.done), ['X', 'A', 'Y'])
+    
+    def test_exhausted_gap_respaces_the_list(self):
+        a, b = self.add_cards(self.todo, 'A', 'B')
+        Card.objects.filter(pk=a.pk).update(position=1.0)
+        Card.objects.filter(pk=b.pk).update(position=1.0 + MIN_POSITION_GAP / 2)
+        card, = self.add_cards(self.done, 'C')
+        
+        response = self.move(card, self.todo, after_card_id=str(a.id))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(self.todo), ['A', 'C', 'B'])
+        positions = list(Card.objects.filter(list=self.todo).order_by('position').values_list('position', flat=True))
+        self.assertTrue(all(after - before >= Card.POSITION_GAP / 2 for before, after in zip(positions, positions[1:])))
+    
+    def test_neighbour_must_be_in_target_list(self):
+        a, = self.add_cards(self.todo, 'A')
+        x, = self.add_cards(self.done, 'X')
+        
+        response = self.move(a, self.todo, after_card_id=str(x.id))
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkCardTests(TestCase):
+    """Tests for POST /api/cards/bulk/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.member = User.objects.create_user('member@example.com', 'member', 'password123!')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        BoardMember.objects.create(board=self.board, user=self.member)
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.todo = List.objects.create(board=self.board, name='Todo')
+        self.done = List.objects.create(board=self.board, name='Done')
+        self.cards = self.add_cards(3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_cards(self, count):
+        cards = []
+        for i in range(count):
+            card = Card.objects.create(list=self.todo, title=f'Card {i}', created_by=self.user)
+            checklist = Checklist.objects.create(card=card, title='Todo')
+            ChecklistItem.objects.create(checklist=checklist, title='Step')
+            Comment.objects.create(card=card, user=self.user, content='Looks good')
+            cards.append(card)
+        return cards
+    
+    def bulk(self, operation, cards=None, **data):
+        card_ids = [str(card.id) for card in (self.cards if cards is None else cards)]
+        return self.client.post(
+            '/api/cards/bulk/',
+            {'card_ids': card_ids, 'operation': operation, **data},
+            format='json'
+        )
+    
+    def test_archive_counts_changed_rows_and_bumps_version(self):
+        Card.objects.filter(pk=self.cards[0].pk).update(is_archived=True)
+        version = Board.objects.get(pk=self.board.pk).version
+        
+        response = self.bulk('archive')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['affected'], 2)
+        self.assertEqual(Card.objects.filter(is_archived=True).count(), 3)
+        self.assertEqual(Board.objects.get(pk=self.board.pk).version, version + 1)
+    
+    def test_assign_member_counts_only_new_assignments(self):
+        CardMember.objects.create(card=self.cards[0], user=self.member)
+        
+        response = self.bulk('assign_member', user_id=str(self.member.id))
+        
+        self.assertEqual(response.json()['affected'], 2)
+        self.assertEqual(CardMember.objects.filter(user=self.member).count(), 3)
+        self.assertEqual(self.bulk('assign_member', user_id=str(self.member.id)).json()['affected'], 0)
+    
+    def test_assign_member_rejects_non_members(self):
+        response = self.bulk('assign_member', user_id=str(self.outsider.id))
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CardMember.objects.filter(user=self.outsider).exists())
+    
+    def test_add_and_remove_label(self):
+        CardLabel.objects.create(card=self.cards[0], label=self.label)
+        
+        self.assertEqual(self.bulk('add_label', label_id=str(self.label.id)).json()['affected'], 2)
+        self.assertEqual(self.bulk('remove_label', label_id=str(self.label.id)).json()['affected'], 3)
+        self.assertFalse(CardLabel.objects.exists())
+    
+    def test_label_from_another_board_is_rejected(self):
+        other = Board.objects.create(name='Other', created_by=self.user)
+        label = Label.objects.create(board=other, name='Bug', color='#ff0000')
+        
+        response = self.bulk('add_label', label_id=str(label.id))
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_move_appends_in_current_order(self):
+        Card.objects.create(list=self.done, title='Already done', created_by=self.user)
+        
+        response = self.bulk('move', cards=list(reversed(self.cards)), list_id=str(self.done.id))
+        
+        self.assertEqual(response.json()['affected'], 3)
+        self.assertEqual(
+            list(Card.objects.filter(list=self.done).values_list('title', flat=True)),
+            ['Already done', 'Card 0', 'Card 1', 'Card 2']
+        )
+    
+    def test_delete_logs_tombstones_in_constant_queries(self):
+        def delete_all():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.bulk('delete', cards=list(Card.objects.all()))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+        
+        few = delete_all()
+        self.add_cards(10)
+        self.assertEqual(delete_all(), few)
+        self.assertEqual(
+            BoardChange.objects.filter(board=self.board, object_type='card', is_deleted=True).count(),
+            13
+        )
+        self.assertFalse(ChecklistItem.objects.exists())
+    
+    def test_unknown_cards_are_not_found(self):
+        other = Board.objects.create(name='Other', created_by=self.outsider)
+        lst = List.objects.create(board=other, name='Hidden')
+        hidden = Card.objects.create(list=lst, title='Hidden')
+        
+        response = self.bulk('archive', cards=[self.cards[0], hidden])
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Card.objects.filter(is_archived=True).exists())
+
+
+class CopyTests(TestCase):
+    """Tests for cards.copying"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.bug = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.idea = Label.objects.create(board=self.board, name='Idea', color='#00ff00')
+        self.target = Board.objects.create(name='Target', created_by=self.user)
+        self.target_bug = Label.objects.create(board=self.target, name='Bug', color='#ff0000')
+    
+    def add_lists(self, lists, cards_per_list):
+        for i in range(lists):
+            lst = List.objects.create(board=self.board, name=f'List {i}')
+            for j in range(cards_per_list):
+                card = Card.objects.create(list=lst, title=f'Card {j}', created_by=self.user)
+                CardLabel.objects.create(card=card, label=self.bug)
+                checklist = Checklist.objects.create(card=card, title='Todo')
+                ChecklistItem.objects.create(checklist=checklist, title='Step')
+                ChecklistItem.objects.create(checklist=checklist, title='Ship')
+    
+    def copy_board_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            copy_board(self.board, self.user, name='Copy')
+        return len(queries)
+    
+    def test_board_copy_query_count_is_constant(self):
+        self.add_lists(1, 1)
+        small = self.copy_board_queries()
+        
+        self.add_lists(3, 5)
+        self.assertEqual(self.copy_board_queries(), small)
+    
+    def test_board_copy_contents(self):
+        self.add_lists(2, 2)
+        Card.objects.filter(title='Card 1').update(is_archived=True)
+        
+        new_board = copy_board(self.board, self.user, name='Copy')
+        
+        self.assertEqual(list(new_board.lists.values_list('name', flat=True)), ['List 0', 'List 1'])
+        self.assertEqual(Card.objects.filter(board=new_board).count(), 2)
+        self.assertEqual(ChecklistItem.objects.filter(board=new_board).count(), 4)
+        copied_labels = CardLabel.objects.filter(board=new_board)
+        self.assertEqual(copied_labels.count(), 2)
+        self.assertFalse(copied_labels.filter(label__board=self.board).exists())
+    
+    def test_card_copy_to_another_board_remaps_labels(self):
+        self.add_lists(1, 1)
+        card = Card.objects.get()
+        CardLabel.objects.create(card=card, label=self.idea)
+        target_list = List.objects.create(board=self.target, name='Inbox')
+        
+        new_card = copy_card(card, target_list, self.user)
+        
+        # Bug has a namesake on the target board, Idea does not
+        self.assertEqual(list(new_card.labels.all()), [self.target_bug])
+        self.assertEqual(new_card.board_id, self.target.pk)
+        self.assertEqual(Checklist.objects.get(card=new_card).board_id, self.target.pk)
+    
+    def test_copies_append_to_the_target(self):
+        self.add_lists(1, 2)
+        source = List.objects.get(board=self.board)
+        first, second = Card.objects.filter(list=source)
+        target_list = List.objects.create(board=self.target, name='Inbox')
+        existing = Card.objects.create(list=target_list, title='Existing')
+        
+        copied = copy_card(second, target_list, self.user, title='Copied')
+        Card.objects.create(list=target_list, title='Later')
+        
+        self.assertEqual(
+            list(Card.objects.filter(list=target_list).values_list('title', flat=True)),
+            ['Existing', 'Copied', 'Later']
+        )
+        self.assertGreater(copied.position, existing.position)
+        
+        new_list = copy_list(source, self.target, self.user)
+        self.assertEqual(new_list.position, target_list.position + 1)
+        self.assertEqual(List.objects.create(board=self.target, name='Next').position, new_list.position + 1)
+        self.assertEqual(
+            list(Card.objects.filter(list=new_list).values_list('title', flat=True)),
+            [first.title, second.title]
+        )
+        self.assertEqual(Card.objects.create(list=new_list, title='Appended').position, 3 * Card.POSITION_GAP)
+
+
+class CommentMentionTests(TestCase):
+    """Tests for @mentions in /api/cards/comments/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.members = {}
+        for username in ['alice', 'bob', 'carol', 'dave', 'erin']:
+            member = User.objects.create_user(f'{username}@example.com', username, 'password123!')
+            BoardMember.objects.create(board=self.board, user=member)
+            self.members[username] = member
+        User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        lst = List.objects.create(board=self.board, name='Todo')
+        self.card = Card.objects.create(list=lst, title='Ship it', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def post_comment(self, content):
+        return self.client.post('/api/cards/comments/', {'card': str(self.card.id), 'content': content}, format='json')
+    
+    def mentioned(self, comment_id):
+        return set(CommentMention.objects.filter(comment_id=comment_id).values_list('user__username', flat=True))
+    
+    def notified(self):
+        return sorted(Notification.objects.filter(type='mention').values_list('user__username', flat=True))
+    
+    def test_only_board_members_are_mentioned(self):
+        response = self.post_comment('@alice and @bob. please ask @outsider, cc @owner')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.mentioned(response.json()['id']), {'alice', 'bob'})
+        self.assertEqual(self.notified(), ['alice', 'bob'])
+    
+    def test_edit_adds_and_removes_mentions(self):
+        comment_id = self.post_comment('@alice @bob').json()['id']
+        
+        response = self.client.patch(
+            f'/api/cards/comments/{comment_id}/',
+            {'content': '@bob @carol'},
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_edited'])
+        self.assertEqual(self.mentioned(comment_id), {'bob', 'carol'})
+        # Bob was already notified; only the new mention notifies
+        self.assertEqual(self.notified(), ['alice', 'bob', 'carol'])
+    
+    def test_query_count_does_not_grow_with_mentions(self):
+        def count_queries(content):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.post_comment(content).status_code, 201)
+            return len(queries)
+        
+        one = count_queries('@alice')
+        self.assertEqual(count_queries('@alice @bob @carol @dave @erin'), one)
+
+
+class BoardDenormalizationTests(TestCase):
+    """Card details carry their card's board"""
+    
+    DETAIL_MODELS = [CardLabel, CardMember, Checklist, ChecklistItem, Comment, Attachment]
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        self.other = Board.objects.create(name='Other', created_by=self.user)
+        for board in (self.board, self.other):
+            BoardMember.objects.create(board=board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.other_list = List.objects.create(board=self.other, name='Inbox')
+        self.card = self.add_card(self.list)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_card(self, lst):
+        card = Card.objects.create(list=lst, title='Ship it', created_by=self.user)
+        CardLabel.objects.create(card=card, label=Label.objects.create(board=lst.board, name='Bug', color='#f00'))
+        CardMember.objects.create(card=card, user=self.user)
+        checklist = Checklist.objects.create(card=card, title='Todo')
+        ChecklistItem.objects.create(checklist=checklist, title='Step')
+        Comment.objects.create(card=card, user=self.user, content='Looks good')
+        Attachment.objects.create(card=card, file_name='spec.pdf', file_url='https://example.com/spec.pdf')
+        return card
+    
+    def assert_details_on(self, board):
+        for model in self.DETAIL_MODELS:
+            self.assertEqual(
+                set(model.objects.values_list('board_id', flat=True)),
+                {board.pk},
+                model.__name__
+            )
+    
+    def test_details_inherit_the_board(self):
+        self.assert_details_on(self.board)
+    
+    def test_move_to_another_board_carries_details(self):
+        response = self.client.patch(
+            f'/api/cards/{self.card.id}/move/',
+            {'list_id': str(self.other_list.id)},
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Card.objects.get(pk=self.card.pk).board_id, self.other.pk)
+        self.assert_details_on(self.other)
+        self.assertTrue(BoardChange.objects.filter(board=self.board, object_id=self.card.pk, is_deleted=True).exists())
+    
+    def test_list_move_to_another_board_carries_cards(self):
+        response = self.client.patch(f'/api/lists/{self.list.id}/', {'board': str(self.other.id)}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assert_details_on(self.other)
+    
+    def test_backfill_fills_missing_boards(self):
+        Card.objects.update(board=None)
+        for model in self.DETAIL_MODELS:
+            model.objects.update(board=None)
+        
+        call_command('backfill_board_ids', batch_size=2, stdout=StringIO())
+        
+        self.assertEqual(Card.objects.get(pk=self.card.pk).board_id, self.board.pk)
+        self.assert_details_on(self.board)
+
+
+class CardTitleFilterTests(TestCase):
+    """Tests for GET /api/cards/?title="""
+    
+    def test_title_is_a_case_insensitive_prefix(self):
+        user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        board = Board.objects.create(name='Roadmap', created_by=user)
+        BoardMember.objects.create(board=board, user=user, role='admin')
+        lst = List.objects.create(board=board, name='Todo')
+        for title in ['Ship it', 'shipping label', 'Worship', 'Review']:
+            Card.objects.create(list=lst, title=title, created_by=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        
+        response = client.get('/api/cards/', {'title': 'SHIP'})
+        
+        titles = sorted(row['title'] for row in response.json()['results'])
+        self.assertEqual(titles, ['Ship it', 'shipping label'])
+
+
+class ChecklistBulkTests(TestCase):
+    """Tests for the whole-checklist actions under /api/cards/checklists/{id}/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.list = List.objects.create(board=self.board, name='Todo')
+        self.card = Card.objects.create(list=self.list, title='Launch', created_by=self.user)
+        self.checklist = Checklist.objects.create(card=self.card, title='Steps')
+        self.items = [ChecklistItem.objects.create(checklist=self.checklist, title=f'Step {i}') for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def url(self, action):
+        return f'/api/cards/checklists/{self.checklist.id}/{action}/'
+    
+    def titles(self):
+        return list(self.checklist.items.order_by('position').values_list('title', flat=True))
+    
+    def test_add_items_appends_in_order(self):
+        version = Board.objects.get(pk=self.board.pk).version
+        
+        response = self.client.post(self.url('add_items'), {'titles': ['Four', 'Five']}, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        positions = sorted(self.checklist.items.values_list('position', flat=True))
+        self.assertEqual(len(set(positions)), 5)
+        self.assertEqual(self.titles(), ['Step 0', 'Step 1', 'Step 2', 'Four', 'Five'])
+        self.assertGreater(Board.objects.get(pk=self.board.pk).version, version)
+        # Single creates continue after the appended items
+        ChecklistItem.objects.create(checklist=self.checklist, title='Six')
+        self.assertEqual(self.titles()[-1], 'Six')
+    
+    def test_reorder_items(self):
+        order = [self.items[2], self.items[0], self.items[1]]
+        
+        response = self.client.post(self.url('reorder_items'), {'item_ids': [str(item.id) for item in order]}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), ['Step 2', 'Step 0', 'Step 1'])
+    
+    def test_reorder_rejects_partial_or_foreign_item_ids(self):
+        other = Checklist.objects.create(card=self.card, title='Other')
+        foreign = ChecklistItem.objects.create(checklist=other, title='Elsewhere')
+        ids = [str(item.id) for item in self.items]
+        
+        for item_ids in [ids[:2], ids[:2] + [str(foreign.id)], ids + [str(foreign.id)], ids + ids[:1]]:
+            response = self.client.post(self.url('reorder_items'), {'item_ids': item_ids}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.titles(), ['Step 0', 'Step 1', 'Step 2'])
+    
+    def test_uncomplete_all_clears_completed_by(self):
+        self.client.post(self.url('complete_all'))
+        self.assertEqual(
+            set(self.checklist.items.values_list('is_completed', 'completed_by')),
+            {(True, self.user.pk)}
+        )
+        
+        self.client.post(self.url('uncomplete_all'))
+        
+        self.assertEqual(
+            set(self.checklist.items.values_list('is_completed', 'completed_by', 'completed_at')),
+            {(False, None, None)}
+        )
@@ -11,11 +11,12 @@ from .views import (
 )
 
 router = DefaultRouter()
-router.register(r'', CardViewSet, basename='card')
 router.register(r'checklists', ChecklistViewSet, basename='checklist')
 router.register(r'checklist-items', ChecklistItemViewSet, basename='checklist-item')
 router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'attachments', AttachmentViewSet, basename='attachment')
+# Registered last so its detail route does not capture the prefixes above
+router.register(r'', CardViewSet, basename='card')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -7,12 +7,22 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
 from .models import Card, CardMember, Checklist, ChecklistItem, Attachment, Comment
+from .ordering import move_card
+from .bulk import apply_bulk_operation
+from .checklists import add_items, reorder_items, set_items_completed
+from .copying import copy_card
+from .filters import CardFilter
+from .pagination import CommentCursorPagination
 from lists.models import List
+from boards.models import BoardMember, Label
 from users.models import User
 from .serializers import (
     CardSerializer, CardDetailSerializer, CardMemberSerializer, MoveCardSerializer,
-    ChecklistSerializer, ChecklistItemSerializer, AttachmentSerializer, CommentSerializer
+    CopyCardSerializer, BulkCardActionSerializer, ChecklistSerializer, ChecklistItemSerializer,
+    AttachmentSerializer, CommentSerializer, AddChecklistItemsSerializer,
+    ReorderChecklistItemsSerializer
 )
 
 
@@ -20,17 +30,13 @@ class CardViewSet(viewsets.ModelViewSet):
     """ViewSet for Card operations"""
     
     permission_classes = [permissions.IsAuthenticated]
+    filterset_class = CardFilter
     
     def get_queryset(self):
         """Return cards for boards where user is a member"""
-        queryset = Card.objects.filter(
-            list__board__members=self.request.user
-        ).distinct()
-        
-        # Filter by list
-        list_id = self.request.query_params.get('list')
-        if list_id:
-            queryset = queryset.filter(list_id=list_id)
+        queryset = Card.objects.visible_to(
+            self.request.user
+        ).select_related('created_by').with_badge_counts()
         
         # Filter archived
         is_archived = self.request.query_params.get('archived')
@@ -39,6 +45,9 @@ class CardViewSet(viewsets.ModelViewSet):
         else:
             queryset = queryset.filter(is_archived=False)
         
+        if self.action == 'retrieve':
+            queryset = queryset.with_details()
+        
         return queryset.order_by('position')
     
     def get_serializer_class(self):
@@ -71,19 +80,99 @@ class CardViewSet(viewsets.ModelViewSet):
         card = self.get_object()
         serializer = MoveCardSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        new_list_id = serializer.validated_data['list_id']
-        new_position = serializer.validated_data['position']
-        
-        new_list = get_object_or_404(List, id=new_list_id)
-        old_list = card.list
+        new_list = get_object_or_404(
+            List.objects.visible_to(request.user),
+            id=data['list_id']
+        )
         
-        card.list = new_list
-        card.position = new_position
-        card.save()
+        try:
+            move_card(
+                card,
+                new_list,
+                after_card_id=data.get('after_card_id'),
+                before_card_id=data.get('before_card_id'),
+                index=data.get('position')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response(CardSerializer(card).data)
     
+    @action(detail=True, methods=['post'])
+    def copy(self, request, pk=None):
+        """Copy card with its checklists and labels"""
+        card = self.get_object()
+        serializer = CopyCardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        target_list = card.list
+        if data.get('list_id'):
+            target_list = get_object_or_404(
+                List.objects.visible_to(request.user),
+                id=data['list_id']
+            )
+        
+        new_card = copy_card(card, target_list, request.user, title=data.get('title'))
+        return Response(CardSerializer(new_card).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Apply one operation to many cards"""
+        serializer = BulkCardActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        card_ids = data['card_ids']
+        
+        # Check membership once for the whole set
+        card_boards = dict(
+            Card.objects.visible_to(request.user).filter(
+                id__in=card_ids
+            ).values_list('id', 'board_id')
+        )
+        if len(card_boards) != len(card_ids):
+            return Response(
+                {'error': 'Some cards were not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        board_ids = set(card_boards.values())
+        
+        params = {}
+        if data.get('user_id'):
+            user = get_object_or_404(User, id=data['user_id'])
+            if data['operation'] == 'assign_member' and BoardMember.objects.filter(
+                user=user,
+                board_id__in=board_ids
+            ).count() != len(board_ids):
+                return Response(
+                    {'error': 'User must be a member of the board of every card'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            params['user'] = user
+        if data.get('label_id'):
+            label = get_object_or_404(Label, id=data['label_id'])
+            if board_ids != {label.board_id}:
+                return Response(
+                    {'error': 'Label must belong to the board of every card'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            params['label'] = label
+        if data.get('list_id'):
+            params['target_list'] = get_object_or_404(
+                List.objects.visible_to(request.user),
+                id=data['list_id']
+            )
+        
+        affected = apply_bulk_operation(card_ids, data['operation'], request.user, **params)
+        
+        return Response({
+            'operation': data['operation'],
+            'card_ids': card_ids,
+            'affected': affected
+        })
+    
     # Member operations
     @action(detail=True, methods=['post'])
     def assign_member(self, request, pk=None):
@@ -127,11 +216,13 @@ class CardViewSet(viewsets.ModelViewSet):
     # Comment operations
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
-        """Get card comments"""
+        """Get card comments, cursor-paginated (newest first unless ?ordering=oldest)"""
         card = self.get_object()
-        comments = card.comments.all()
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        comments = Comment.objects.filter(card=card).select_related('user').prefetch_related('mentions__user')
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def add_comment(self, request, pk=None):
@@ -160,7 +251,54 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Checklist.objects.filter(card__list__board__members=self.request.user).distinct()
+        return Checklist.objects.visible_to(self.request.user).prefetch_related(
+            Prefetch(
+                'items',
+                queryset=ChecklistItem.objects.select_related('assigned_to', 'completed_by')
+            )
+        )
+    
+    def checklist_response(self):
+        """The checklist re-read with its items after a bulk change"""
+        return Response(ChecklistSerializer(self.get_object()).data)
+    
+    @action(detail=True, methods=['post'])
+    def add_items(self, request, pk=None):
+        """Append one item per title, e.g. from a pasted list"""
+        checklist = self.get_object()
+        serializer = AddChecklistItemsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        items = add_items(checklist, serializer.validated_data['titles'])
+        return Response(
+            ChecklistItemSerializer(items, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=True, methods=['post'])
+    def reorder_items(self, request, pk=None):
+        """Reorder the items to follow item_ids"""
+        checklist = self.get_object()
+        serializer = ReorderChecklistItemsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            reorder_items(checklist, serializer.validated_data['item_ids'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.checklist_response()
+    
+    @action(detail=True, methods=['post'])
+    def complete_all(self, request, pk=None):
+        """Mark every item completed"""
+        set_items_completed(self.get_object(), True, request.user)
+        return self.checklist_response()
+    
+    @action(detail=True, methods=['post'])
+    def uncomplete_all(self, request, pk=None):
+        """Mark every item not completed"""
+        set_items_completed(self.get_object(), False)
+        return self.checklist_response()
 
 
 class ChecklistItemViewSet(viewsets.ModelViewSet):
@@ -170,9 +308,8 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return ChecklistItem.objects.filter(
-            checklist__card__list__board__members=self.request.user
-        ).distinct()
+        # The change log reads the card id through the checklist
+        return ChecklistItem.objects.visible_to(self.request.user).select_related('checklist')
     
     @action(detail=True, methods=['post'])
     def toggle(self, request, pk=None):
@@ -192,11 +329,19 @@ class CommentViewSet(viewsets.ModelViewSet):
     
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentCursorPagination
     
     def get_queryset(self):
-        return Comment.objects.filter(
-            card__list__board__members=self.request.user
-        ).distinct()
+        queryset = Comment.objects.visible_to(
+            self.request.user
+        ).select_related('user').prefetch_related('mentions__user')
+        
+        # Filter by card
+        card_id = self.request.query_params.get('card')
+        if card_id:
+            queryset = queryset.filter(card_id=card_id)
+        
+        return queryset
     
     def perform_update(self, serializer):
         """Mark comment as edited when updated"""
@@ -210,6 +355,4 @@ class AttachmentViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Attachment.objects.filter(
-            card__list__board__members=self.request.user
-        ).distinct()
\ No newline at end of file
+        return Attachment.objects.visible_to(self.request.user)
\ No newline at end of file
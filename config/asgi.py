@@ -15,24 +15,21 @@ config/asgi.py
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 django_asgi_app = get_asgi_application()
 
-# Import websocket routing (we'll create this later)
-# from notifications.routing import websocket_urlpatterns
+# Imported after Django is set up: these pull in models
+from users.middleware import JWTAuthMiddleware
+from boards.routing import websocket_urlpatterns
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
-            URLRouter(
-                # websocket_urlpatterns  # Uncomment when we create routing
-                []  # Empty for now
-            )
+        JWTAuthMiddleware(
+            URLRouter(websocket_urlpatterns)
         )
     ),
-})
\ No newline at end of file
+})
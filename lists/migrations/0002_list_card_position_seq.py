@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Cast, Ceil, Coalesce
+
+CARD_POSITION_GAP = 65536.0
+
+
+def seed_card_position_seq(apps, schema_editor):
+    """Start each list counter at its current highest card position"""
+    List = apps.get_model('lists', 'List')
+    Card = apps.get_model('cards', 'Card')
+    List.objects.update(
+        card_position_seq=Coalesce(
+            Subquery(
+                Card.objects.filter(list=OuterRef('pk'))
+                .order_by()
+                .values('list')
+                .annotate(max_seq=Cast(Ceil(Max('position') / CARD_POSITION_GAP), models.IntegerField()))
+                .values('max_seq')
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0003_alter_card_position'),
+        ('lists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='card_position_seq',
+            field=models.IntegerField(default=0, editable=False, help_text='Last position (in Card.POSITION_GAP units) handed out to a card in this list'),
+        ),
+        migrations.RunPython(seed_card_position_seq, migrations.RunPython.noop),
+    ]
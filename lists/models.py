@@ -4,14 +4,24 @@ lists/models.py
 """
 
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from boards.models import Board
+from boards.positions import PositionedQuerySet, assign_positions, exclude_counters
+from boards.scoping import MemberScopedQuerySet
+from boards.versioning import muted_board_changes, record_board_changes
+
+
+class ListQuerySet(MemberScopedQuerySet, PositionedQuerySet):
+    """QuerySet for List"""
 
 
 class List(models.Model):
     """List model (columns in a board)"""
     
+    POSITION_PARENT = 'board'
+    POSITION_SEQ = 'list_position_seq'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     board = models.ForeignKey(
         Board,
@@ -23,10 +33,18 @@ class List(models.Model):
     
     is_archived = models.BooleanField(default=False)
     
+    card_position_seq = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Last position (in Card.POSITION_GAP units) handed out to a card in this list"
+    )
+    
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     archived_at = models.DateTimeField(blank=True, null=True)
     
+    objects = ListQuerySet.as_manager()
+    
     class Meta:
         db_table = 'lists'
         verbose_name = 'List'
@@ -54,10 +72,19 @@ class List(models.Model):
     
     def save(self, *args, **kwargs):
         """Auto-assign position if not provided"""
-        if self.position == 0 and not self.pk:
-            # Get the highest position in this board
-            max_position = List.objects.filter(
-                board=self.board
-            ).aggregate(models.Max('position'))['position__max']
-            self.position = (max_position or 0) + 1
-        super().save(*args, **kwargs)
\ No newline at end of file
+        assign_positions(List, [self])
+        exclude_counters(self, kwargs, 'card_position_seq')
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        """Delete the list and its cards, logging one board change for all of it"""
+        board_id, list_id = self.board_id, self.pk
+        with transaction.atomic():
+            card_ids = list(self.cards.values_list('id', flat=True))
+            with muted_board_changes():
+                deleted = super().delete(*args, **kwargs)
+            record_board_changes(
+                board_id,
+                [('list', list_id, True)] + [('card', card_id, True) for card_id in card_ids]
+            )
+        return deleted
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+List Ordering
+lists/ordering.py
+
+Moving a list shifts every list between its old and new position by one
+with a single ``UPDATE``, holding row locks on all of the board's lists
+(taken in primary-key order). Moves on one board therefore run one at a
+time, and every move starts from positions no other move is halfway
+through rewriting. The board row itself is only locked afterwards, when
+the change is recorded, like on every other write path (see
+``boards.versioning``). ``renumber_lists`` closes the holes left by
+archived and deleted lists the same way.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+from boards.models import Board
+from boards.versioning import record_board_changes
+from .models import List
+
+
+def _shift_lists(board_id, list_id, low, high, delta):
+    """Add ``delta`` to the position of the board's other open lists in ``[low, high]``; return their ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE lists SET position = position + %s
+            WHERE board_id = %s AND NOT is_archived AND id <> %s
+              AND position BETWEEN %s AND %s
+            RETURNING id
+            """,
+            [delta, board_id, list_id, low, high]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _lock_lists(board_id):
+    """Lock every list on the board, in primary-key order"""
+    list(List.objects.select_for_update().filter(board_id=board_id).order_by('pk').values_list('id', flat=True))
+
+
+def move_list(list_obj, new_position):
+    """
+    Move ``list_obj`` to ``new_position``, shifting the lists in between.
+    
+    Returns the board's open lists as ``{'id', 'position'}`` rows in their
+    final order.
+    """
+    with transaction.atomic():
+        _lock_lists(list_obj.board_id)
+        # Read under the lock: a move that committed meanwhile may have shifted this list
+        old_position = List.objects.values_list('position', flat=True).get(pk=list_obj.pk)
+        
+        if new_position != old_position:
+            if new_position > old_position:
+                shifted = _shift_lists(list_obj.board_id, list_obj.pk, old_position + 1, new_position, -1)
+            else:
+                shifted = _shift_lists(list_obj.board_id, list_obj.pk, new_position, old_position - 1, 1)
+            List.objects.filter(pk=list_obj.pk).update(position=new_position, updated_at=timezone.now())
+            # Set-based writes skip the save signals that log board changes
+            record_board_changes(
+                list_obj.board_id,
+                [('list', list_id, False) for list_id in [list_obj.pk, *shifted]]
+            )
+        list_obj.refresh_from_db(fields=['position', 'updated_at'])
+        
+        return list(
+            List.objects.filter(
+                board_id=list_obj.board_id,
+                is_archived=False
+            ).order_by('position', 'id').values('id', 'position')
+        )
+
+
+def renumber_lists(board_id):
+    """
+    Renumber every list on a board 1..n in its current order.
+    
+    Also winds ``Board.list_position_seq`` back to n, so new lists continue
+    right after the last one. The board row is locked after the lists, and
+    before the lists are counted, so no list can be created in between.
+    Returns the ids of the lists that moved.
+    """
+    with transaction.atomic():
+        _lock_lists(board_id)
+        Board.objects.select_for_update().only('id').get(pk=board_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE lists SET position = ranked.ordinal
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (ORDER BY position, created_at, id) AS ordinal
+                    FROM lists
+                    WHERE board_id = %s
+                ) AS ranked
+                WHERE lists.id = ranked.id AND lists.position <> ranked.ordinal
+                RETURNING lists.id
+                """,
+                [board_id]
+            )
+            renumbered = [row[0] for row in cursor.fetchall()]
+        Board.objects.filter(pk=board_id).update(
+            list_position_seq=List.objects.filter(board_id=board_id).count()
+        )
+        if renumbered:
+            record_board_changes(board_id, [('list', list_id, False) for list_id in renumbered])
+    return renumbered
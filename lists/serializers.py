@@ -21,6 +21,9 @@ class ListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'archived_at']
     
     def get_cards_count(self, obj):
+        # Annotated by ListViewSet for list and detail responses
+        if hasattr(obj, 'cards_count'):
+            return obj.cards_count
         return obj.cards.filter(is_archived=False).count()
 
 
@@ -37,4 +40,26 @@ class ListDetailSerializer(ListSerializer):
 class MoveListSerializer(serializers.Serializer):
     """Serializer for moving lists"""
     
-    position = serializers.IntegerField(min_value=0, required=True)
\ No newline at end of file
+    position = serializers.IntegerField(min_value=0, required=True)
+
+
+class CopyListSerializer(serializers.Serializer):
+    """Serializer for copying lists"""
+    
+    board_id = serializers.UUIDField(
+        required=False,
+        help_text="Board to copy the list into (defaults to the list's own board)"
+    )
+    name = serializers.CharField(max_length=255, required=False)
+
+
+class MoveListCardsSerializer(serializers.Serializer):
+    """Serializer for moving every card of a list"""
+    
+    list_id = serializers.UUIDField(required=True)
+
+
+class SortListSerializer(serializers.Serializer):
+    """Serializer for sorting the cards of a list"""
+    
+    order_by = serializers.ChoiceField(choices=['due_date', 'created_at', 'title'])
@@ -1,3 +1,269 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from django.db import connection, connections
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from boards.models import Board, BoardChange, BoardMember, Label
+from cards.models import Card, CardLabel, Checklist, Comment
+from cards.bulk import apply_bulk_operation
+from cards.ordering import move_card, move_list_cards, sort_list
+from .models import List
+from .ordering import move_list, renumber_lists
 
-# Create your tests here.
+
+class LockOrderTests(TransactionTestCase):
+    """List and card ordering running side by side must not deadlock"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.lists = [List.objects.create(board=self.board, name=f'List {i}') for i in range(3)]
+        for lst in self.lists:
+            for j in range(4):
+                Card.objects.create(list=lst, title=f'Card {j}', created_by=self.user)
+    
+    def run_concurrently(self, *operations, rounds=15):
+        errors = []
+        
+        def worker(operation):
+            try:
+                for _ in range(rounds):
+                    operation()
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=worker, args=(operation,)) for operation in operations]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+    
+    def test_list_moves_and_card_moves(self):
+        first, second, third = self.lists
+        
+        def move_lists():
+            move_list(List.objects.get(pk=first.pk), 3)
+            move_list(List.objects.get(pk=first.pk), 1)
+            renumber_lists(self.board.pk)
+        
+        def move_cards():
+            for from_list, to_list in [(second, third), (third, second)]:
+                card = Card.objects.filter(list=from_list).last()
+                if card is not None:
+                    move_card(card, to_list, index=0)
+            sort_list(second, 'title')
+        
+        def edit_cards():
+            for card in Card.objects.filter(list__in=[second, third])[:2]:
+                card.title = 'Edited'
+                card.save()
+        
+        errors = self.run_concurrently(move_lists, move_cards, edit_cards, move_lists, move_cards)
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(Card.objects.count(), 12)
+    
+    def test_opposite_cross_board_moves(self):
+        other_board = Board.objects.create(name='Other', created_by=self.user)
+        other_list = List.objects.create(board=other_board, name='Inbox')
+        for j in range(4):
+            Card.objects.create(list=other_list, title=f'Other {j}', created_by=self.user)
+        source = self.lists[0]
+        
+        def move_between(from_list, to_list):
+            def operation():
+                card = Card.objects.filter(list=from_list).first()
+                if card is not None:
+                    move_card(card, to_list)
+                move_list_cards(from_list, to_list)
+            return operation
+        
+        errors = self.run_concurrently(
+            move_between(source, other_list),
+            move_between(other_list, source),
+            move_between(source, other_list),
+            move_between(other_list, source),
+        )
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            Card.objects.exclude(board_id=F('list__board_id')).count(),
+            0
+        )
+    
+    def test_bulk_operations_across_two_boards(self):
+        other_board = Board.objects.create(name='Other', created_by=self.user)
+        other_list = List.objects.create(board=other_board, name='Inbox')
+        for j in range(4):
+            Card.objects.create(list=other_list, title=f'Other {j}', created_by=self.user)
+        ours = list(Card.objects.filter(list=self.lists[0]).order_by('position').values_list('id', flat=True))
+        theirs = list(Card.objects.filter(list=other_list).order_by('position').values_list('id', flat=True))
+        # Disjoint cards, read back by position: one set meets this board first, the other the other board
+        this_board_first = [ours[0], theirs[2], theirs[3]]
+        other_board_first = [theirs[0], ours[2], ours[3]]
+        
+        def toggle(card_ids):
+            def operation():
+                for name in ['archive', 'complete', 'restore', 'uncomplete']:
+                    apply_bulk_operation(card_ids, name, self.user)
+            return operation
+        
+        errors = self.run_concurrently(toggle(this_board_first), toggle(other_board_first), rounds=200)
+        
+        self.assertEqual(errors, [])
+        self.assertFalse(Card.objects.filter(is_archived=True).exists())
+
+
+class ListCardActionTests(TestCase):
+    """Tests for the list-level card actions under /api/lists/{id}/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.source = List.objects.create(board=self.board, name='Todo')
+        self.target = List.objects.create(board=self.board, name='Done')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_cards(self, lst, *titles, **fields):
+        return [Card.objects.create(list=lst, title=title, created_by=self.user, **fields) for title in titles]
+    
+    def titles(self, lst):
+        return list(Card.objects.filter(list=lst).order_by('position', 'id').values_list('title', flat=True))
+    
+    def version(self, board=None):
+        return Board.objects.get(pk=(board or self.board).pk).version
+    
+    def test_move_cards_appends_open_cards_in_order(self):
+        self.add_cards(self.target, 'Existing')
+        self.add_cards(self.source, 'A', 'B', 'C')
+        self.add_cards(self.source, 'Old', is_archived=True)
+        version = self.version()
+        
+        response = self.client.post(f'/api/lists/{self.source.id}/move_cards/', {'list_id': str(self.target.id)})
+        
+        self.assertEqual(response.json()['moved'], 3)
+        self.assertEqual(self.titles(self.target), ['Existing', 'A', 'B', 'C'])
+        self.assertEqual(self.titles(self.source), ['Old'])
+        self.assertGreater(self.version(), version)
+        # Later creates continue after the moved cards
+        self.add_cards(self.target, 'Next')
+        self.assertEqual(self.titles(self.target)[-1], 'Next')
+    
+    def test_move_cards_to_another_board(self):
+        other = Board.objects.create(name='Other', created_by=self.user)
+        BoardMember.objects.create(board=other, user=self.user, role='admin')
+        other_list = List.objects.create(board=other, name='Inbox')
+        moved = self.add_cards(self.source, 'A', 'B')
+        
+        self.client.post(f'/api/lists/{self.source.id}/move_cards/', {'list_id': str(other_list.id)})
+        
+        self.assertEqual(set(Card.objects.filter(list=other_list).values_list('board_id', flat=True)), {other.pk})
+        self.assertEqual(
+            BoardChange.objects.filter(board=self.board, object_id__in=[card.pk for card in moved], is_deleted=True).count(),
+            2
+        )
+    
+    def test_sort_by_title_and_due_date(self):
+        now = timezone.now()
+        self.add_cards(self.source, 'banana', due_date=now + timedelta(days=2))
+        self.add_cards(self.source, 'Cherry')
+        self.add_cards(self.source, 'apple', due_date=now + timedelta(days=1))
+        
+        self.client.post(f'/api/lists/{self.source.id}/sort/', {'order_by': 'title'})
+        self.assertEqual(self.titles(self.source), ['apple', 'banana', 'Cherry'])
+        
+        version = self.version()
+        self.client.post(f'/api/lists/{self.source.id}/sort/', {'order_by': 'due_date'})
+        self.assertEqual(self.titles(self.source), ['apple', 'banana', 'Cherry'])
+        self.assertEqual(self.version(), version + 1)
+        
+        response = self.client.post(f'/api/lists/{self.source.id}/sort/', {'order_by': 'colour'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_archive_cards_in_one_board_change(self):
+        self.add_cards(self.source, 'A', 'B')
+        self.add_cards(self.source, 'Old', is_archived=True)
+        version = self.version()
+        
+        response = self.client.post(f'/api/lists/{self.source.id}/archive_cards/')
+        
+        self.assertEqual(response.json()['archived'], 2)
+        self.assertFalse(Card.objects.filter(list=self.source, is_archived=False).exists())
+        self.assertEqual(self.version(), version + 1)
+        self.assertEqual(BoardChange.objects.filter(board=self.board, version=version + 1).count(), 2)
+    
+    def test_move_list_returns_final_ordering(self):
+        third = List.objects.create(board=self.board, name='Later')
+        
+        response = self.client.patch(f'/api/lists/{third.id}/move/', {'position': 1}, format='json')
+        
+        self.assertEqual(
+            [row['id'] for row in response.json()['ordering']],
+            [str(third.id), str(self.source.id), str(self.target.id)]
+        )
+
+
+class ListReadTests(TestCase):
+    """Tests for GET /api/lists/ and /api/lists/{id}/"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.board = Board.objects.create(name='Roadmap', created_by=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user, role='admin')
+        self.lists = [List.objects.create(board=self.board, name=f'List {i}') for i in range(2)]
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#f00')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def add_cards(self, count):
+        for lst in self.lists:
+            for i in range(count):
+                card = Card.objects.create(list=lst, title=f'Card {i}', created_by=self.user)
+                CardLabel.objects.create(card=card, label=self.label)
+                Checklist.objects.create(card=card, title='Steps')
+                Comment.objects.create(card=card, user=self.user, content='Looks good')
+    
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'board': str(self.board.id)})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+    
+    def test_archived_cards_are_left_out(self):
+        lst = self.lists[0]
+        Card.objects.create(list=lst, title='Open', created_by=self.user)
+        Card.objects.create(list=lst, title='Old', created_by=self.user, is_archived=True)
+        
+        detail, _ = self.get(f'/api/lists/{lst.id}/')
+        listing, _ = self.get('/api/lists/')
+        
+        self.assertEqual([card['title'] for card in detail['cards']], ['Open'])
+        self.assertEqual(detail['cards_count'], 1)
+        self.assertEqual({row['id']: row['cards_count'] for row in listing['results']}, {str(lst.id): 1, str(self.lists[1].id): 0})
+    
+    def test_query_count_does_not_grow_with_lists_or_cards(self):
+        lst = self.lists[0]
+        self.add_cards(2)
+        _, small_detail = self.get(f'/api/lists/{lst.id}/')
+        _, small_listing = self.get('/api/lists/')
+        self.lists += [List.objects.create(board=self.board, name=f'More {i}') for i in range(2)]
+        Card.objects.all().delete()
+        self.add_cards(10)
+        
+        detail, large_detail = self.get(f'/api/lists/{lst.id}/')
+        listing, large_listing = self.get('/api/lists/')
+        
+        self.assertEqual((large_detail, large_listing), (small_detail, small_listing))
+        self.assertEqual(len(detail['cards']), 10)
+        self.assertEqual(detail['cards'][0]['comments_count'], 1)
+        self.assertEqual([row['cards_count'] for row in listing['results']], [10] * 4)
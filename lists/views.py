@@ -6,8 +6,22 @@ lists/views.py
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.shortcuts import get_object_or_404
 from .models import List
-from .serializers import ListSerializer, ListDetailSerializer, MoveListSerializer
+from .ordering import move_list
+from boards.models import Board
+from boards.snapshot import MAX_CARDS_PER_LIST, build_list_cards_page
+from boards.versioning import muted_board_changes, record_changes_by_board
+from cards.models import Card
+from cards.bulk import apply_bulk_operation
+from cards.copying import copy_list
+from cards.ordering import move_list_cards, sort_list
+from .serializers import (
+    ListSerializer, ListDetailSerializer, MoveListSerializer, CopyListSerializer,
+    MoveListCardsSerializer, SortListSerializer
+)
 
 
 class ListViewSet(viewsets.ModelViewSet):
@@ -17,9 +31,7 @@ class ListViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return lists for boards where user is a member"""
-        queryset = List.objects.filter(
-            board__members=self.request.user
-        ).distinct()
+        queryset = List.objects.visible_to(self.request.user)
         
         # Filter by board
         board_id = self.request.query_params.get('board')
@@ -33,6 +45,20 @@ class ListViewSet(viewsets.ModelViewSet):
         else:
             queryset = queryset.filter(is_archived=False)
         
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.annotate(
+                cards_count=Count('cards', filter=Q(cards__is_archived=False))
+            )
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'cards',
+                    queryset=Card.objects.filter(
+                        is_archived=False
+                    ).select_related('created_by').with_badge_counts().order_by('position', 'id')
+                )
+            )
+        
         return queryset.order_by('position')
     
     def get_serializer_class(self):
@@ -41,6 +67,23 @@ class ListViewSet(viewsets.ModelViewSet):
             return ListDetailSerializer
         return ListSerializer
     
+    def perform_update(self, serializer):
+        """Carry the list's cards along when it is moved to another board"""
+        previous_board_id = serializer.instance.board_id
+        board = serializer.validated_data.get('board')
+        if board is None or board.pk == previous_board_id:
+            serializer.save()
+            return
+        with transaction.atomic():
+            # Rows first, then both boards' change logs in a fixed order (see boards.versioning)
+            with muted_board_changes():
+                list_obj = serializer.save()
+            Card.objects.filter(list=list_obj).set_board(list_obj.board_id)
+            record_changes_by_board({
+                previous_board_id: [('list', list_obj.pk, True)],
+                list_obj.board_id: [('list', list_obj.pk, False)],
+            })
+    
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
         """Archive list"""
@@ -59,6 +102,20 @@ class ListViewSet(viewsets.ModelViewSet):
             'message': 'List restored successfully'
         })
     
+    @action(detail=True, methods=['get'])
+    def cards(self, request, pk=None):
+        """Get the next page of open cards after ?cursor= (from the board snapshot)"""
+        list_obj = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), MAX_CARDS_PER_LIST)
+        except ValueError:
+            limit = 50
+        try:
+            page = build_list_cards_page(list_obj, request.query_params.get('cursor'), limit)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
+    
     @action(detail=True, methods=['patch'])
     def move(self, request, pk=None):
         """Move list to new position"""
@@ -66,33 +123,67 @@ class ListViewSet(viewsets.ModelViewSet):
         serializer = MoveListSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        new_position = serializer.validated_data['position']
-        old_position = list_obj.position
+        ordering = move_list(list_obj, serializer.validated_data['position'])
         
-        if new_position == old_position:
-            return Response(ListSerializer(list_obj).data)
+        return Response({
+            **ListSerializer(list_obj).data,
+            'ordering': ordering
+        })
+    
+    @action(detail=True, methods=['post'])
+    def copy(self, request, pk=None):
+        """Copy list with all of its cards"""
+        list_obj = self.get_object()
+        serializer = CopyListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        # Update positions
-        lists_in_board = List.objects.filter(
-            board=list_obj.board,
-            is_archived=False
-        ).exclude(id=list_obj.id).order_by('position')
+        target_board = list_obj.board
+        if data.get('board_id'):
+            target_board = get_object_or_404(
+                Board.objects.visible_to(request.user),
+                id=data['board_id']
+            )
         
-        # Reorder
-        if new_position > old_position:
-            # Moving right
-            for lst in lists_in_board:
-                if old_position < lst.position <= new_position:
-                    lst.position -= 1
-                    lst.save()
-        else:
-            # Moving left
-            for lst in lists_in_board:
-                if new_position <= lst.position < old_position:
-                    lst.position += 1
-                    lst.save()
+        new_list = copy_list(list_obj, target_board, request.user, name=data.get('name'))
+        return Response(ListSerializer(new_list).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def move_cards(self, request, pk=None):
+        """Move every open card to the end of another list"""
+        list_obj = self.get_object()
+        serializer = MoveListCardsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        list_obj.position = new_position
-        list_obj.save()
+        target_list = get_object_or_404(
+            List.objects.visible_to(request.user),
+            id=serializer.validated_data['list_id']
+        )
+        moved = move_list_cards(list_obj, target_list)
+        return Response({
+            'message': f'{moved} cards moved',
+            'moved': moved
+        })
+    
+    @action(detail=True, methods=['post'])
+    def sort(self, request, pk=None):
+        """Sort the list's cards by due date, creation date or title"""
+        list_obj = self.get_object()
+        serializer = SortListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        return Response(ListSerializer(list_obj).data)
\ No newline at end of file
+        sort_list(list_obj, serializer.validated_data['order_by'])
+        return Response({
+            'message': 'List sorted successfully'
+        })
+    
+    @action(detail=True, methods=['post'])
+    def archive_cards(self, request, pk=None):
+        """Archive every card in the list"""
+        list_obj = self.get_object()
+        card_ids = list(list_obj.cards.filter(is_archived=False).values_list('id', flat=True))
+        archived = apply_bulk_operation(card_ids, 'archive', request.user) if card_ids else 0
+        return Response({
+            'message': f'{archived} cards archived',
+            'archived': archived
+        })
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+WebSocket Authentication
+users/middleware.py
+
+Authenticates WebSocket connections with the same SimpleJWT access tokens
+as the REST API. Browsers cannot set headers on a WebSocket handshake, so
+the token is read from ``?token=`` and, for other clients, from an
+``Authorization: Bearer`` header.
+"""
+
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+def _raw_token(scope):
+    """Return the access token from the query string or Authorization header, if any"""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    if query.get('token'):
+        return query['token'][0]
+    headers = dict(scope.get('headers', []))
+    auth = headers.get(b'authorization', b'').decode().split()
+    if len(auth) == 2 and auth[0] == 'Bearer':
+        return auth[1]
+    return None
+
+
+@database_sync_to_async
+def _user_for_token(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate ``scope['user']`` from a SimpleJWT access token"""
+    
+    async def __call__(self, scope, receive, send):
+        raw_token = _raw_token(scope)
+        scope = dict(scope, user=await _user_for_token(raw_token) if raw_token else AnonymousUser())
+        return await super().__call__(scope, receive, send)
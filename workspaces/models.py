@@ -8,11 +8,16 @@ from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 from users.models import User
+from boards.scoping import MemberScopedQuerySet
 
 
 class Workspace(models.Model):
     """Workspace/Organization model"""
     
+    MEMBERSHIP_MODEL = 'workspaces.WorkspaceMember'
+    MEMBERSHIP_FIELD = 'workspace'
+    MEMBERSHIP_PATH = 'pk'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, db_index=True)
@@ -34,6 +39,8 @@ class Workspace(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MemberScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'workspaces'
         verbose_name = 'Workspace'
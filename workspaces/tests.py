@@ -1,3 +1,36 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import User
+from boards.models import Board, BoardMember
+from .models import Workspace, WorkspaceMember
 
-# Create your tests here.
+
+class WorkspaceScopingTests(TestCase):
+    """Workspaces are visible to their members only, each exactly once"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', 'owner', 'password123!')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider', 'password123!')
+        colleague = User.objects.create_user('colleague@example.com', 'colleague', 'password123!')
+        self.workspace = Workspace.objects.create(name='Acme', slug='acme', owner=self.user)
+        for user in (self.user, colleague):
+            WorkspaceMember.objects.create(workspace=self.workspace, user=user)
+        # Board memberships in the workspace must not repeat it
+        for name in ('Roadmap', 'Support'):
+            board = Board.objects.create(name=name, workspace=self.workspace, created_by=self.user)
+            BoardMember.objects.create(board=board, user=self.user)
+        self.client = APIClient()
+    
+    def test_non_member_sees_nothing(self):
+        self.client.force_authenticate(self.outsider)
+        
+        self.assertEqual(self.client.get('/api/workspaces/').json()['results'], [])
+        self.assertEqual(self.client.get(f'/api/workspaces/{self.workspace.id}/').status_code, 404)
+    
+    def test_member_sees_each_workspace_once(self):
+        self.client.force_authenticate(self.user)
+        
+        response = self.client.get('/api/workspaces/')
+        
+        self.assertEqual([row['id'] for row in response.json()['results']], [str(self.workspace.id)])
+        self.assertEqual(self.client.get(f'/api/workspaces/{self.workspace.id}/').status_code, 200)
@@ -24,9 +24,7 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return workspaces where user is a member"""
-        return Workspace.objects.filter(
-            members=self.request.user
-        ).distinct()
+        return Workspace.objects.visible_to(self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer"""